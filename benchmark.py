@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+# Benchmark of the hot paths.
+#
+# Usage: benchmark.py [-o result.json] [-b baseline.json] [-t 0.1] [name ...]
+#
+# Each benchmark function returns (n, run) where run() does n operations, or
+# None if it cannot run (e.g. NumPy is not installed). Speed is reported in
+# ops/s, and allocations as bytes and blocks (tracemalloc) per operation. With
+# a baseline from a previous -o, a benchmark slower by more than the threshold
+# is reported as a regression and the exit status is 1.
+
+from iclib import formula, salat, qibla
+from iclib.hijri import ummqura
+import argparse
+import collections
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+try:
+	import numpy
+	from iclib import vformula
+except ImportError:
+	vformula = None
+
+
+N = 100000
+_jds = [2451544.5 + i for i in range(N)]
+_dates = [formula.jd_to_gregorian(jd) for jd in _jds]
+
+def gregorian_to_jd():
+	f = formula.gregorian_to_jd
+	return N, lambda: [f(y, m, d) for y, m, d in _dates]
+
+def gregorian_to_jd_bulk():
+	if vformula is None: return None
+	y, m, d = (numpy.array(i) for i in zip(*_dates))
+	return N, lambda: vformula.gregorian_to_jd(y, m, d)
+
+def jd_to_gregorian():
+	f = formula.jd_to_gregorian
+	return N, lambda: [f(jd) for jd in _jds]
+
+def jd_to_gregorian_bulk():
+	if vformula is None: return None
+	jds = numpy.array(_jds)
+	return N, lambda: vformula.jd_to_gregorian(jds)
+
+def formula_eq_time():
+	f = formula.eq_time
+	return N, lambda: [f(jd) for jd in _jds]
+
+def formula_decl_sun():
+	f = formula.decl_sun
+	return N, lambda: [f(jd) for jd in _jds]
+
+def formula_hour_angle():
+	f = formula.hour_angle
+	args = [(lat % 180 - 90, -18, (lat * 7) % 47 - 23.5) for lat in range(N)]
+	return N, lambda: [f(*a) for a in args]
+
+def _calculator():
+	return (salat.TimeCalculator().gregorian_date(2015, 1, 1)
+		.location(-6.38043079, 106.85337984, 0, 7).method('egypt'))
+
+def salat_calculate():
+	c = _calculator()
+	return 10000, lambda: [c.calculate() for _ in range(10000)]
+
+def salat_calculate_raw():
+	c = _calculator()
+	return 10000, lambda: [c.calculate_raw() for _ in range(10000)]
+
+def salat_calculate_times():
+	"""calculate and conversion to datetime.time"""
+	c = _calculator()
+	return 10000, lambda: [list(c.calculate()) for _ in range(10000)]
+
+def salat_year_loop():
+	"""a year by calculate and date_relative, op is a year"""
+	def run():
+		c = _calculator()
+		for _ in range(365):
+			c.calculate()
+			c.date_relative(1)
+	return 1, run
+
+def salat_year_range():
+	"""a year by calculate_range, op is a year"""
+	c = _calculator()
+	return 1, lambda: c.calculate_range(365)
+
+def salat_year_iter_days():
+	"""a year by iter_days, op is a year"""
+	c = _calculator()
+	return 1, lambda: collections.deque(c.iter_days(365), maxlen=0)
+
+def qibla_direction():
+	f = qibla.direction
+	args = [(i % 180 - 89.5, i % 360 - 179.5) for i in range(10000)]
+	return 10000, lambda: [f(*a) for a in args]
+
+def qibla_direction_str():
+	f = qibla.direction_str
+	args = [(i % 180 - 89.5, i % 360 - 179.5) for i in range(10000)]
+	return 10000, lambda: [f(*a) for a in args]
+
+def ummqura_from_gregorian():
+	"""every day of ummqura.DEFAULT_TABLE"""
+	f = ummqura.from_gregorian
+	t = ummqura.DEFAULT_TABLE
+	dates = [formula.jd_to_gregorian(jd)
+		for jd in range(t.month_start[0], t.month_start[-1])]
+	return len(dates), lambda: [f(*d) for d in dates]
+
+def ummqura_to_gregorian():
+	"""every day of ummqura.DEFAULT_TABLE"""
+	f = ummqura.to_gregorian
+	t = ummqura.DEFAULT_TABLE
+	dates = [(t.year + i // 12, i % 12 + 1, d) for i in range(t.months)
+		for d in range(1, t.month_len(i) + 1)]
+	return len(dates), lambda: [f(*d) for d in dates]
+
+def _measure(n, run, repeat=5):
+	"""Return the best time per operation in seconds"""
+	return min(timeit.repeat(run, number=1, repeat=repeat)) / n
+
+def _allocations(n, run):
+	"""Return bytes and blocks allocated per operation"""
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	result = run()
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+	del result
+	stats = after.compare_to(before, 'filename')
+	size = sum(s.size_diff for s in stats if s.size_diff > 0)
+	count = sum(s.count_diff for s in stats if s.count_diff > 0)
+	return size / float(n), count / float(n)
+
+def _run(names):
+	results = {}
+	for k,v in loc:
+		if (k.startswith('_') or not callable(v) or v.__module__ != __name__
+				or (names and k not in names)):
+			continue
+		bench = v()
+		if bench is None:
+			print('{:<26} skipped'.format(k))
+			continue
+		t = _measure(*bench)
+		size, count = _allocations(*bench)
+		results[k] = {'ops_per_sec': 1 / t, 'bytes_per_op': size,
+			'blocks_per_op': count}
+		print('{:<26} {:>14,.0f} ops/s {:>12,.0f} B/op {:>10,.1f} blocks/op'
+			.format(k, 1 / t, size, count))
+	return results
+
+def _compare(results, baseline, threshold):
+	"""Print the changes against baseline, return number of regressions"""
+	regressions = 0
+	print()
+	for k, r in sorted(results.items()):
+		if k not in baseline: continue
+		ratio = r['ops_per_sec'] / baseline[k]['ops_per_sec']
+		status = ''
+		if ratio < 1 - threshold:
+			status = 'REGRESSION'
+			regressions += 1
+		print('{:<26} {:>+8.1%} {}'.format(k, ratio - 1, status))
+	return regressions
+
+loc = sorted(locals().items())
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Benchmark of iclib')
+	parser.add_argument('names', nargs='*', help='benchmarks to run (all)')
+	parser.add_argument('-o', '--output', help='save result as JSON')
+	parser.add_argument('-b', '--baseline', help='compare with saved JSON')
+	parser.add_argument('-t', '--threshold', type=float, default=0.1,
+		help='slowdown counted as regression (0.1)')
+	args = parser.parse_args()
+
+	results = _run(args.names)
+	if args.output:
+		with open(args.output, 'w') as f:
+			json.dump({'python': platform.python_version(),
+				'machine': platform.machine(), 'results': results}, f,
+				indent=1, sort_keys=True)
+	if args.baseline:
+		with open(args.baseline) as f:
+			baseline = json.load(f)['results']
+		if _compare(results, baseline, args.threshold):
+			sys.exit(1)
@@ -8,20 +8,20 @@ def ummqura_gregorian():
 	print(d, '->', ummqura.to_gregorian(*d))
 
 def ummqura_gregorian_first():
-	print(ummqura.to_gregorian(1420, 1, 1))
+	print(ummqura.to_gregorian(1300, 1, 1))
 
 def ummqura_gregorian_last():
-	print(ummqura.to_gregorian(1450, 12, 30))
+	print(ummqura.to_gregorian(1600, 12, 30))
 
 def gregorian_ummqura():
 	d = (2015, 1, 1)
 	print(d, '->', ummqura.from_gregorian(*d))
 
 def gregorian_ummqura_first():
-	print(ummqura.from_gregorian(1999, 4, 17))
+	print(ummqura.from_gregorian(1882, 11, 12))
 
 def gregorian_ummqura_last():
-	print(ummqura.from_gregorian(2029, 5, 14))
+	print(ummqura.from_gregorian(2174, 11, 25))
 
 loc = sorted(locals().items())
 for k,v in loc:
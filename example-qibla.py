@@ -45,6 +45,12 @@ def makkah_west():
 	print(qibla.direction_dms(lat, lng))
 	print(qibla.direction_str(lat, lng))
 
+def grid_error():
+	"""error of Grid against the exact formula, within the documented bound"""
+	error = qibla.Grid(0.5).max_error()
+	print(error)
+	assert error < 0.013
+
 loc = sorted(locals().items())
 for k,v in loc:
 	if not k.startswith('_') and callable(v):
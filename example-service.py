@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+# Simulated load on iclib.service.TimeService: bursts of identical requests,
+# like right after an adhan notification, plus some distinct ones.
+
+from iclib import salat, service
+import asyncio
+import datetime as dt
+import random
+import time
+
+
+date = dt.date.today()
+cities = [salat.TimeCalculator().method('egypt').location(lat, lng, 0, tz)
+	.config() for lat, lng, tz in ((-6.2, 106.8, 7), (21.4, 39.8, 3), (51.5, -0.1, 0),
+		(40.7, -74.0, -5), (33.7, 73.0, 5))]
+
+async def _burst(s, n):
+	chosen = [random.choice(cities) for _ in range(n)]
+	results = await asyncio.gather(*(s.calculate(c, date) for c in chosen))
+	# every result is the same as calculating directly
+	assert all(r == c.calculate_raw(date) for c, r in zip(chosen, results))
+
+async def _main():
+	s = service.TimeService(ttl=60)
+
+	t = time.perf_counter()
+	await _burst(s, 10000)
+	print('burst of 10000 requests: {:.3f} s'.format(time.perf_counter() - t))
+	print('hits', s.hits, 'misses', s.misses, 'coalesced', s.coalesced)
+
+	t = time.perf_counter()
+	await _burst(s, 10000)
+	print('cached burst of 10000 requests: {:.3f} s'.format(
+		time.perf_counter() - t))
+	print('hits', s.hits, 'misses', s.misses, 'coalesced', s.coalesced)
+
+	table = await s.calculate_range(cities[0], date, 365)
+	print('year table:', len(table), 'days, first', table.get_times(0).fajr)
+
+	# a cancelled request does not cancel the others waiting for the result
+	s.clear()
+	first = asyncio.ensure_future(s.calculate(cities[1], date))
+	second = asyncio.ensure_future(s.calculate(cities[1], date))
+	await asyncio.sleep(0)
+	first.cancel()
+	print('after cancel:', (await second).fajr, 'coalesced', s.coalesced)
+
+asyncio.run(_main())
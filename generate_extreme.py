@@ -1,6 +1,13 @@
 #!/usr/bin/python3
-from iclib import salat
+# Map of extreme conditions, where prayer times cannot be calculated.
+#
+# Usage: generate_extreme.py METHOD [LAT_STEP [DAY_STEP]]
+#
+# METHOD is a name in salat.STANDARD_ANGLES or custom angles as FAJR,ISHA (e.g.
+# 18.5,17). Steps are in degrees and days (default 1 and 5).
+from iclib import extreme, salat
 import datetime as dt
+import numpy as np
 import PIL.Image
 import PIL.ImageDraw
 import PIL.ImageFont
@@ -16,61 +23,50 @@ def frange(start, stop, step):
 	f = 1 / step
 	return (i / f for i in range(int(start * f), int(stop * f), int(step * f)))
 
-def to_color(times):
-	"""Color representation of extreme (could not calculate) salat times"""
-	m = times.times
-	# fajr (½red), isha (½red), sunrise (½green), maghrib (½green), asr (blue)
-	r1, r2, g1, g2, b = 0, 0, 0, 0, 0
-	if   m[salat.FAJR]    ==  inf: r1 =  0x44
-	elif m[salat.FAJR]    == -inf: r1 = -0x44
-	if   m[salat.ISHA]    ==  inf: r2 = -0x44
-	elif m[salat.ISHA]    == -inf: r2 =  0x44
-	if   m[salat.SUNRISE] ==  inf: g1 =  0x44
-	elif m[salat.SUNRISE] == -inf: g1 = -0x44
-	if   m[salat.MAGHRIB] ==  inf: g2 = -0x44
-	elif m[salat.MAGHRIB] == -inf: g2 =  0x44
-	if   m[salat.ASR]     ==  inf: b  = -0x88
-	elif m[salat.ASR]     == -inf: b  =  0x88
-	return r1, r2, g1, g2, b
+def to_colors(grid):
+	"""Color representation of extreme (could not calculate) salat times
+
+	Return array of the last axis: fajr (½red), isha (½red), sunrise
+	(½green), maghrib (½green), asr (blue)
+	"""
+	sign = np.array([0x44, -0x44, 0x44, -0x44, -0x88])
+	return grid[..., [salat.FAJR, salat.ISHA, salat.SUNRISE, salat.MAGHRIB,
+		salat.ASR]] * sign
+
+def to_pixels(p):
+	"""Image (lat x 6 panels) of to_colors result, with separator lines"""
+	gray = lambda v: np.repeat(v[..., np.newaxis], 3, axis=-1)
+	panels = [gray(p[..., 0]*2 + 0x88), gray(p[..., 1]*2 + 0x88),
+		gray(p[..., 2]*2 + 0x88), gray(p[..., 3]*2 + 0x88),
+		gray(p[..., 4] + 0x88),
+		np.stack((p[..., 0] + p[..., 1] + 0x88, p[..., 2] + p[..., 3] + 0x88,
+			p[..., 4] + 0x88), axis=-1)]
+	line = np.empty((p.shape[0], 1, 3), dtype=int)
+	line[...] = rgb('#333333')
+	row = [panels[0]]
+	for panel in panels[1:]:
+		row.extend((line, panel))
+	return np.clip(np.concatenate(row, axis=1), 0, 0xff).astype(np.uint8)
 
 METHOD = sys.argv[1]
-DAYS = (0, 365, 5/1)  # horizontal frange
+ANGLE = (METHOD if METHOD in salat.STANDARD_ANGLES
+	else tuple(float(a) for a in METHOD.split(',')))
+LAT_STEP = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+DAY_STEP = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+DAYS = (0, 365, DAY_STEP)  # horizontal frange
 WIDTH = xlen(*DAYS)
-LATS = (90, -90 - 1/1, -1/1)  # vertical frange
+LATS = (90, -90 - LAT_STEP, -LAT_STEP)  # vertical frange
 HEIGHT = xlen(*LATS)
-inf = float('inf')
 
 if __name__ == '__main__':
-	pixels = []
-	c = salat.TimeCalculator().method(METHOD)
-
-	for lat in frange(*LATS):  # horizontal line from top to bottom
+	lats = list(frange(*LATS))  # from top to bottom
+	dates = [dt.date(2015, 1, 1) + dt.timedelta(yday) for yday in frange(*DAYS)]
+	pixels = to_pixels(to_colors(extreme.grid(lats, dates, (ANGLE,),
+		workers=None)))
+	for i, lat in enumerate(lats):
 		if lat % 15 == 0:  # draw only horizontal separator
-			pixels.extend((rgb('#333333'),) * (6 * WIDTH + 5))
-			continue
-		
-		c.location(lat, 0, 0, 0)
-		row = [to_color(c.date(dt.datetime(2015, 1, 1) + dt.timedelta(yday)).calculate())
-			for yday in frange(*DAYS)]
-		for p in row:  # fajr
-			pixels.append((p[0]*2 + 0x88,) * 3)
-		pixels.append(rgb('#333333'))
-		for p in row:  # isha
-			pixels.append((p[1]*2 + 0x88,) * 3)
-		pixels.append(rgb('#333333'))
-		for p in row:  # sunrise
-			pixels.append((p[2]*2 + 0x88,) * 3)
-		pixels.append(rgb('#333333'))
-		for p in row:  # maghrib
-			pixels.append((p[3]*2 + 0x88,) * 3)
-		pixels.append(rgb('#333333'))
-		for p in row:  # asr
-			pixels.append((p[4] + 0x88,) * 3)
-		pixels.append(rgb('#333333'))
-		for p in row:  # all
-			pixels.append((p[0] + p[1] + 0x88, p[2] + p[3] + 0x88, p[4] + 0x88))
-	ximg = PIL.Image.new('RGB', (6 * WIDTH + 5, HEIGHT))
-	ximg.putdata(pixels)
+			pixels[i] = rgb('#333333')
+	ximg = PIL.Image.fromarray(pixels, 'RGB')
 	draw = PIL.ImageDraw.Draw(ximg)
 	font = PIL.ImageFont.load_default()
 	for i, name in enumerate(('FAJR', 'ISHA', 'SUNRISE', 'MAGRIB', 'ASR', 'MIXED')):
@@ -81,11 +77,10 @@ if __name__ == '__main__':
 	world = PIL.Image.open('Tissot_indicatrix_world_map_equirectangular_proj_by_Eric_Gaba_from_wikimedia.png', 'r')
 	world = world.resize((WIDTH*2, HEIGHT), PIL.Image.ANTIALIAS)
 	draw = PIL.ImageDraw.Draw(world)
-	for y in range(0, world.size[1], 15):
+	for y in range(0, world.size[1], int(round(15 / LAT_STEP))):
 		draw.line([0, y, world.size[0], y], rgb('#333333'), 1)
 	
 	img = PIL.Image.new('RGB', (ximg.size[0] + world.size[0], HEIGHT))
 	img.paste(world, (0, 0))
 	img.paste(ximg, (world.size[0], 0))
 	img.save('generate_extreme_' + METHOD + '.png')
-
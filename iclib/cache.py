@@ -0,0 +1,184 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache of prayer times shared by nearby locations
+
+Locations are quantized into cells of latitude and longitude, and the times
+of a cell are calculated at its center. Longitude only shifts every time by
+4 minutes per degree, so its cell size follows from the tolerance. The effect
+of latitude varies (it is large near the poles), so it is checked when a cell
+is calculated, and a cell where it exceeds the tolerance is split in half by
+latitude, up to a number of levels.
+"""
+
+from . import ephemeris
+from . import formula
+from . import salat
+import collections
+import math
+import sys
+import threading
+
+
+class LocationCache(object):
+	"""Thread-safe LRU cache of prayer times by location cell and date
+
+	A time from the cache differs from the time of the exact location by at
+	most tolerance, half of it from the longitude and half from the latitude
+	(assuming the time is monotonic in latitude within a cell, which holds
+	except at the edge of extreme conditions). Cells which do not meet it are
+	remembered, and the lookup continues with the half cells. If the smallest
+	cell does not meet it either, the times are calculated at the exact
+	location (a bypass). The least recently used entry is evicted if there are
+	already size entries or they take more than max_bytes (estimated).
+
+	Attributes:
+	hits as int - number of lookups found in the cache
+	misses as int - number of lookups calculating a cell used for the result
+	bypasses as int - number of lookups calculated at the exact location
+	"""
+
+	def __init__(self, tolerance=5.0, size=100000, max_bytes=None, levels=6,
+			provider=ephemeris.sun):
+		"""Create the cache
+
+		Param:
+		tolerance as number - maximum difference of a time in seconds
+		size as int - maximum number of entries
+		max_bytes as int - maximum estimated memory of the entries, None
+			means no limit
+		levels as int - number of cell sizes by latitude, the smallest is
+			1 / 2 ** (levels - 1) of the largest
+		provider as function - sun function of an ephemeris provider
+		"""
+		self.tolerance = tolerance
+		# the time changes by 240 seconds per degree of longitude
+		self.cell = tolerance / 240.0
+		self.size = size
+		self.max_bytes = max_bytes
+		self.levels = levels
+		self.provider = provider
+		self.hits = 0
+		self.misses = 0
+		self.bypasses = 0
+		self._bytes = 0
+		self._entries = collections.OrderedDict()
+		self._lock = threading.Lock()
+
+	def calculate(self, config, date):
+		"""Calculate the prayer times of a date, like Config.calculate
+
+		Param:
+		config as salat.Config - method and location
+		date as datetime.date
+
+		Return:
+		result as salat.Times
+		"""
+		return salat.Times(list(self.calculate_raw(config, date)),
+			config.high_lat is not None)
+
+	def calculate_raw(self, config, date):
+		"""Like calculate, but return salat.RawTimes"""
+		jd = formula.gregorian_to_jd(date.year, date.month, date.day)
+		j = int(math.floor(config.lng / self.cell))
+		lat_cell = self.cell
+		calculated = False
+		for level in range(self.levels):
+			i = int(math.floor(config.lat / lat_cell))
+			key = (config._replace(lat=(level, i), lng=j), jd)
+			with self._lock:
+				value = self._entries.get(key, _MISSING)
+				if value is not _MISSING:
+					self._entries.move_to_end(key)
+			if value is _MISSING:
+				# calculated outside the lock, at worst twice by concurrent misses
+				value = self._calculate_cell(config, i, j, lat_cell, jd)
+				self._add(key, value)
+				calculated = True
+			if value is not None:
+				with self._lock:
+					if calculated: self.misses += 1
+					else: self.hits += 1
+				return value
+			lat_cell /= 2
+		with self._lock:
+			self.bypasses += 1
+		return config._calculate_jd(jd, self.provider)
+
+	def _add(self, key, value):
+		entries = self._entries
+		with self._lock:
+			old = entries.pop(key, _MISSING)
+			if old is not _MISSING: self._bytes -= _entry_bytes(key, old)
+			entries[key] = value
+			self._bytes += _entry_bytes(key, value)
+			while entries and (len(entries) > self.size or (
+					self.max_bytes is not None and self._bytes > self.max_bytes)):
+				self._bytes -= _entry_bytes(*entries.popitem(last=False))
+
+	def _calculate_cell(self, config, i, j, lat_cell, jd):
+		"""Return RawTimes at the center of a cell, None if not accurate"""
+		low = i * lat_cell
+		high = low + lat_cell
+		if low < -90 or high > 90: return None
+		lng = (j + 0.5) * self.cell
+		center = config._replace(lat=(low + high) / 2, lng=lng)._calculate_jd(
+			jd, self.provider)
+		limit = self.tolerance / 2 / 3600.0 # in hours
+		for lat in (low, high):
+			edge = config._replace(lat=lat, lng=lng)._calculate_jd(
+				jd, self.provider)
+			for a, b in zip(center, edge):
+				if a != b and not abs(a - b) <= limit: # also inf and -inf
+					return None
+		return center
+
+	def stats(self):
+		"""Return the statistics as dict
+
+		It has 'hits', 'misses', 'bypasses', 'entries', 'bytes' (estimated),
+		and 'hit_rate' (hits per lookup, 0 if none).
+		"""
+		with self._lock:
+			lookups = self.hits + self.misses + self.bypasses
+			return {'hits': self.hits, 'misses': self.misses,
+				'bypasses': self.bypasses, 'entries': len(self._entries),
+				'bytes': self._bytes,
+				'hit_rate': self.hits / float(lookups) if lookups else 0.0}
+
+	def __len__(self):
+		return len(self._entries)
+
+	def clear(self):
+		"""Remove all entries and reset the counters"""
+		with self._lock:
+			self._entries.clear()
+			self._bytes = 0
+			self.hits = 0
+			self.misses = 0
+			self.bypasses = 0
+
+
+_MISSING = object()
+
+def _entry_bytes(key, value):
+	"""Return estimated memory of an entry, not counting shared objects"""
+	config, jd = key
+	size = (sys.getsizeof(key) + sys.getsizeof(config) + sys.getsizeof(jd)
+		+ sys.getsizeof(config.lat) + sys.getsizeof(config.lat[1])
+		+ sys.getsizeof(config.lng)
+		+ 100) # the link of OrderedDict and the slot of dict
+	if value is not None:
+		size += sys.getsizeof(value) + sum(sys.getsizeof(t) for t in value)
+	return size
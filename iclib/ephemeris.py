@@ -0,0 +1,248 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Providers of the Sun's ephemeris
+
+An ephemeris provider is an object having method sun(jd) which returns 2-tuple
+of declination of the Sun in degrees and Equation of Time in hours for Julian
+Day jd. It can be set to salat.TimeCalculator by its ephemeris method.
+"""
+
+from . import formula
+import collections
+import math
+import mmap
+import struct
+import threading
+
+
+NEAREST = 0
+LINEAR = 1
+QUADRATIC = 2
+
+
+def sun(jd):
+	"""Return declination of the Sun and Equation of Time of Julian Day
+
+	This is the default provider, evaluating formula directly.
+	"""
+	return formula.decl_sun(jd), formula.eq_time(jd)
+
+def daily(jd, days=None, anchor=32):
+	"""Generate the Sun's ephemeris of consecutive days
+
+	It is like calling sun(jd), sun(jd + 1), etc, but instead of evaluating
+	every sin and cos of formula.eq_time and formula.decl_sun, the angles are
+	advanced by a day using angle-addition (rotation), and multiple angles
+	are derived from them. Every anchor days they are calculated directly
+	again so the rounding error does not accumulate, the result differs from
+	sun by less than 1e-11 degree and 1e-12 hour.
+
+	Param:
+	jd as number - Julian Day of the first day
+	days as int - number of days, None means infinite
+	anchor as int - days between direct calculations
+
+	Return:
+	generator of 2-tuple - like sun
+	"""
+	# see formula.eq_time and formula.decl_sun for the series
+	step_l0 = math.radians(36000.7698 / 36525.0)
+	cos_step_l0, sin_step_l0 = math.cos(step_l0), math.sin(step_l0)
+	step_a = math.radians(57.297 * 2 * math.pi / 365.25)
+	cos_step_a, sin_step_a = math.cos(step_a), math.sin(step_a)
+	phases = [(math.cos(math.radians(p)), math.sin(math.radians(p)))
+		for p in (79.547, 82.682, 59.722)]
+	i = 0
+	while days is None or i < days:
+		u = (jd + i - 2451545) / 36525.0
+		if i % anchor == 0:
+			l0 = math.radians(280.46607 + 36000.7698 * u)
+			c1, s1 = math.cos(l0), math.sin(l0)
+			a = math.radians(57.297 * 2 * math.pi * (jd + i - 2451545) / 365.25)
+			ca1, sa1 = math.cos(a), math.sin(a)
+		else:
+			c1, s1 = (c1 * cos_step_l0 - s1 * sin_step_l0,
+				s1 * cos_step_l0 + c1 * sin_step_l0)
+			ca1, sa1 = (ca1 * cos_step_a - sa1 * sin_step_a,
+				sa1 * cos_step_a + ca1 * sin_step_a)
+		c2, s2 = c1 * c1 - s1 * s1, 2 * s1 * c1
+		c3, s3 = c2 * c1 - s2 * s1, s2 * c1 + c2 * s1
+		s4 = 2 * s2 * c2
+		et = (
+			-(1789 + 237 * u) * s1
+			- (7146 - 62 * u) * c1
+			+ (9934 - 14 * u) * s2
+			- (29 +    5 * u) * c2
+			+ (74 +   10 * u) * s3
+			+ (320 -   4 * u) * c3
+			- 212             * s4) / 60000.0
+		ca2, sa2 = ca1 * ca1 - sa1 * sa1, 2 * sa1 * ca1
+		ca3, sa3 = ca2 * ca1 - sa2 * sa1, sa2 * ca1 + ca2 * sa1
+		# sin(k * a - p) = sin(k * a) cos(p) - cos(k * a) sin(p)
+		ds = (0.37877
+			+ 23.264  * (sa1 * phases[0][0] - ca1 * phases[0][1])
+			+ 0.3812  * (sa2 * phases[1][0] - ca2 * phases[1][1])
+			+ 0.17132 * (sa3 * phases[2][0] - ca3 * phases[2][1]))
+		yield ds, et
+		i += 1
+
+
+class Cache(object):
+	"""Thread-safe LRU cache of the Sun's ephemeris
+
+	Julian Day is quantized to 1/resolution day before being used as the key
+	and for the calculation, so the result does not depend on whether it is a
+	hit or a miss. The default resolution is a minute, which changes the
+	declination by less than 0.0003 degrees. The least recently used entry is
+	evicted if there are already size entries.
+
+	Attributes:
+	hits as int - number of lookups found in the cache
+	misses as int - number of lookups calculated
+	"""
+
+	def __init__(self, size=1024, resolution=1440, provider=sun):
+		"""Create the cache
+
+		Param:
+		size as int - maximum number of entries
+		resolution as int - number of keys per day
+		provider as function - sun function of the underlying provider
+		"""
+		self.size = size
+		self.resolution = resolution
+		self.provider = provider
+		self.hits = 0
+		self.misses = 0
+		self._entries = collections.OrderedDict()
+		self._lock = threading.Lock()
+
+	def sun(self, jd):
+		"""Return declination of the Sun and Equation of Time of Julian Day"""
+		key = int(round(jd * self.resolution))
+		entries = self._entries
+		with self._lock:
+			try:
+				value = entries[key]
+			except KeyError:
+				self.misses += 1
+			else:
+				entries.move_to_end(key)
+				self.hits += 1
+				return value
+		# calculated outside the lock, at worst twice by concurrent misses
+		value = self.provider(key / float(self.resolution))
+		with self._lock:
+			entries[key] = value
+			while len(entries) > self.size:
+				entries.popitem(last=False)
+		return value
+
+	def __len__(self):
+		return len(self._entries)
+
+	def clear(self):
+		"""Remove all entries and reset the counters"""
+		with self._lock:
+			self._entries.clear()
+			self.hits = 0
+			self.misses = 0
+
+
+# Table file layout, all little-endian:
+# - header: magic, Julian Day of the first record, step in days, number of
+#   records, interpolation (NEAREST, LINEAR, or QUADRATIC), 3 padding bytes
+# - records: declination and Equation of Time as 32-bit floats
+_MAGIC = b'ICLIBEPH'
+_HEADER = struct.Struct('<8sddIB3x')
+_RECORD = struct.Struct('<ff')
+
+def write_table(path, start_jd=2415020.5, end_jd=2488433.5, step=1.0,
+		interpolation=QUADRATIC, provider=sun):
+	"""Write the Sun's ephemeris table file to be read by Table
+
+	The default range is from 1900-01-01 to 2100-12-31 (0h UT), a record per
+	day, about 570 KiB.
+
+	Param:
+	path as str - file path
+	start_jd as number - Julian Day of the first record
+	end_jd as number - Julian Day of the last record (inclusive)
+	step as number - days between records
+	interpolation - NEAREST, LINEAR, or QUADRATIC (3 nearest records), how
+		Table reads Julian Day between records
+	provider as function - sun function to calculate the records
+	"""
+	count = int((end_jd - start_jd) / step) + 1
+	with open(path, 'wb') as f:
+		f.write(_HEADER.pack(_MAGIC, start_jd, step, count, interpolation))
+		for i in range(count):
+			f.write(_RECORD.pack(*provider(start_jd + i * step)))
+
+
+class Table(object):
+	"""Sun's ephemeris read from a table file written by write_table
+
+	The file is memory-mapped read-only, so processes reading the same file
+	share its pages. Julian Day outside the table falls back to the formula.
+
+	Attributes:
+	start_jd, end_jd, step, interpolation - from the header
+	"""
+
+	def __init__(self, path):
+		with open(path, 'rb') as f:
+			self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, self.start_jd, self.step, self._count, self.interpolation = (
+			_HEADER.unpack_from(self._map))
+		if magic != _MAGIC:
+			self.close()
+			raise ValueError('not an ephemeris table: ' + path)
+		self.end_jd = self.start_jd + (self._count - 1) * self.step
+
+	def sun(self, jd):
+		"""Return declination of the Sun and Equation of Time of Julian Day"""
+		x = (jd - self.start_jd) / self.step
+		if not 0 <= x <= self._count - 1:
+			return sun(jd)
+		if self.interpolation == NEAREST or self._count == 1:
+			return self._record(int(x + 0.5))
+		if self.interpolation == LINEAR or self._count < 3:
+			i = min(int(x), self._count - 2)
+			f = x - i
+			ds0, et0 = self._record(i)
+			ds1, et1 = self._record(i + 1)
+			return ds0 + (ds1 - ds0) * f, et0 + (et1 - et0) * f
+		# Lagrange interpolation around the nearest record
+		i = min(max(int(x + 0.5), 1), self._count - 2)
+		f = x - i
+		ds0, et0 = self._record(i - 1)
+		ds1, et1 = self._record(i)
+		ds2, et2 = self._record(i + 1)
+		a = f * (f - 1) / 2.0
+		b = 1 - f * f
+		c = f * (f + 1) / 2.0
+		return ds0 * a + ds1 * b + ds2 * c, et0 * a + et1 * b + et2 * c
+
+	def _record(self, i):
+		return _RECORD.unpack_from(self._map, _HEADER.size + i * _RECORD.size)
+
+	def close(self):
+		self._map.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
@@ -0,0 +1,147 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Streaming export of prayer timetables
+
+Rows are generated one at a time and written as they come, so the memory used
+does not depend on the number of rows. Times which cannot be calculated (-inf
+or inf, see salat.Times) are written as:
+	CSV - empty field
+	JSON Lines - null
+	columnar - MISSING_BEFORE for -inf and MISSING_AFTER for inf
+"""
+
+from . import salat
+from .util import hms, hm
+import array
+import csv
+import datetime
+import json
+import math
+import struct
+import sys
+
+
+HEADER = ('location', 'date') + salat.RawTimes._fields
+
+def rows(locations, date, days, method=('mwl',)):
+	"""Generate prayer times of locations for consecutive days
+
+	Rows are ordered by date, then by location.
+
+	Param:
+	locations as iterable of 4-tuple - lat, lng, h, and tz like in
+		TimeCalculator.location
+	date as datetime.date - first date
+	days as int - number of days
+	method as tuple - args of TimeCalculator.method, e.g. ('egypt', 'hanafi')
+
+	Return:
+	generator of 8-tuple - location index, date as datetime.date, then the
+		times in hours like HEADER
+	"""
+	dates = [date + datetime.timedelta(i) for i in range(days)]
+	c = salat.TimeCalculator().method(*method)
+	for row in c.calculate_many(locations, dates):
+		yield (row[1], dates[row[0]]) + row[2:]
+
+def text_rows(rows, use_second=False):
+	"""Format rows as str, date as ISO 8601 and time as 'HH:MM[:SS]'
+
+	Times which cannot be calculated are None.
+	"""
+	fmt = '{:02d}:{:02d}:{:02d}' if use_second else '{:02d}:{:02d}'
+	conv = hms if use_second else hm
+	for row in rows:
+		yield (row[0], row[1].isoformat()) + tuple(
+			None if t is None else fmt.format(*t)
+			for t in map(conv, row[2:]))
+
+def write_csv(f, rows, use_second=False):
+	"""Write rows to a text file as CSV with HEADER as the first line"""
+	writer = csv.writer(f)
+	writer.writerow(HEADER)
+	for row in text_rows(rows, use_second):
+		writer.writerow(row)
+
+def write_jsonl(f, rows, use_second=False):
+	"""Write rows to a text file as JSON Lines, an object per row"""
+	for row in text_rows(rows, use_second):
+		f.write(json.dumps(dict(zip(HEADER, row)), separators=(',', ':')))
+		f.write('\n')
+
+# Columnar file layout, all little-endian 32-bit signed int:
+# - header: magic (8 bytes), number of columns
+# - blocks: number of rows n, then each column of HEADER as n values; date is
+#   Julian Day at midday, times are minutes (or seconds) after midnight
+# - end: a block having n = 0
+MAGIC = b'ICLIBTT1'
+MISSING_BEFORE = -2 ** 31
+MISSING_AFTER = 2 ** 31 - 1
+
+def write_columnar(f, rows, use_second=False, block_size=4096):
+	"""Write rows to a binary file in columnar blocks
+
+	Param:
+	f - file opened in binary mode
+	rows - from function rows
+	use_second as bool - times in seconds instead of minutes
+	block_size as int - maximum number of rows per block
+	"""
+	unit = 3600 if use_second else 60
+	f.write(MAGIC + struct.pack('<i', len(HEADER)))
+	block = []
+	for row in rows:
+		block.append(row)
+		if len(block) == block_size:
+			_write_block(f, block, unit)
+			block = []
+	if block:
+		_write_block(f, block, unit)
+	f.write(struct.pack('<i', 0))
+
+def read_columnar(f):
+	"""Read a file written by write_columnar, a block at a time
+
+	Return:
+	generator of list of array - columns of HEADER, dates are Julian Day at
+		midday (int) and times are in minutes or seconds
+	"""
+	if f.read(8) != MAGIC: raise ValueError('not a columnar timetable')
+	ncol, = struct.unpack('<i', f.read(4))
+	while True:
+		n, = struct.unpack('<i', f.read(4))
+		if n == 0: return
+		cols = []
+		for _ in range(ncol):
+			col = array.array('i')
+			col.frombytes(f.read(4 * n))
+			if sys.byteorder == 'big': col.byteswap()
+			cols.append(col)
+		yield cols
+
+def _write_block(f, block, unit):
+	f.write(struct.pack('<i', len(block)))
+	cols = [array.array('i', (row[0] for row in block)),
+		array.array('i', (row[1].toordinal() + 1721425 for row in block))]
+	for i in range(2, len(HEADER)):
+		cols.append(array.array('i', (_encode(row[i], unit) for row in block)))
+	for col in cols:
+		if sys.byteorder == 'big': col.byteswap()
+		f.write(col.tobytes())
+
+def _encode(hours, unit):
+	if hours == -salat.inf: return MISSING_BEFORE
+	if hours == salat.inf: return MISSING_AFTER
+	# rounded up like util.hm and util.hms
+	return int(math.ceil(hours * unit))
@@ -0,0 +1,179 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Analysis of extreme conditions, where prayer times cannot be calculated
+
+Near the poles the Sun may not reach the altitude of a time, which is then
+-inf or inf (see salat.Times). Whether it happens depends only on the
+latitude and the Sun's declination, so it is calculated here for a whole grid
+of latitudes and dates at once. It needs NumPy, like vformula.
+"""
+
+from . import formula, salat, vformula
+import concurrent.futures
+import datetime
+import numpy as np
+
+
+# classes of a time in the grid
+NORMAL = 0
+BEFORE = -1 # -inf
+AFTER = 1 # inf
+
+
+def grid(lats, dates, method=('mwl',), h=0, workers=0, chunk_size=256):
+	"""Classify the prayer times of latitudes and dates
+
+	The class of a time is the same as the result of TimeCalculator.calculate
+	(at midday of longitude 0, without high latitude rule), including Zuhr
+	and Asr being AFTER when the Sun does not rise.
+
+	Param:
+	lats as iterable of number - latitudes in degrees
+	dates as iterable of datetime.date - dates
+	method as tuple - args of TimeCalculator.method, e.g. ('egypt', 'hanafi')
+		or ((18.5, 17),)
+	h as number - altitude/height in meters
+	workers as int - number of processes, None means number of CPUs, 0 means
+		calculate in this process
+	chunk_size as int - number of latitudes per unit of work
+
+	Return:
+	int8 array of shape (latitudes, dates, salat.N) - NORMAL, BEFORE, or AFTER,
+		the last axis is indexed by salat.FAJR, salat.SUNRISE, etc
+	"""
+	c = salat.TimeCalculator().method(*method)
+	args = (c.fajr_angle, c.isha_angle, c.asr_ratio, h)
+	lats = np.asarray(list(lats), dtype=float)
+	jd = np.array([d.toordinal() + 1721425.0 for d in dates]) # midday
+	ds = vformula.decl_sun(jd)
+	if workers == 0:
+		return _classify(lats, ds, *args)
+	chunks = [lats[i:i + chunk_size] for i in range(0, len(lats), chunk_size)]
+	with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+		results = list(executor.map(_classify, chunks,
+			*([x] * len(chunks) for x in (ds,) + args)))
+	if not results:
+		return np.zeros((0, len(ds), salat.N), dtype=np.int8)
+	return np.concatenate(results)
+
+def critical_latitudes(date, method=('mwl',), h=0):
+	"""Return the latitudes where the prayer times become undefined in a date
+
+	Every time is defined at the equator. Going to a pole, it is undefined
+	(like in grid) from a latitude onward, which is calculated analytically
+	from the Sun's altitude of the time (formula.lat_range), or by bisection
+	for Asr because its altitude depends on the latitude.
+
+	Param:
+	date as datetime.date - the date, the Sun's declination is at its midday
+	method as tuple - args of TimeCalculator.method
+	h as number - altitude/height in meters
+
+	Return:
+	list of 2-tuple - southern and northern limit in degrees for each time
+		(indexed by salat.FAJR, etc), or -90 and 90 if it is always defined;
+		the time is defined between the limits
+	"""
+	c = salat.TimeCalculator().method(*method)
+	ds = formula.decl_sun(date.toordinal() + 1721425.0)
+	alt = -0.8333 - 0.0347 * h ** 0.5 # like formula.sunrise
+	horizon = formula.lat_range(alt, ds)
+	# the Sun does not rise beyond these, then Zuhr and Asr are AFTER
+	dark = (ds - 90 + alt, ds + 90 - alt)
+	limits = [None] * salat.N
+	limits[salat.FAJR] = formula.lat_range(-c.fajr_angle, ds)
+	limits[salat.SUNRISE] = limits[salat.MAGHRIB] = horizon
+	limits[salat.ZUHR] = dark
+	limits[salat.ASR] = (max(dark[0], _asr_limit(-1, ds, c.asr_ratio)),
+		min(dark[1], _asr_limit(1, ds, c.asr_ratio)))
+	limits[salat.ISHA] = formula.lat_range(-c.isha_angle, ds)
+	return [(max(low, -90), min(high, 90)) for low, high in limits]
+
+def undefined_dates(lat, date, days, method=('mwl',), h=0):
+	"""Return the dates where the prayer times are undefined in a latitude
+
+	Param:
+	lat as number - latitude in degrees
+	date as datetime.date - first date
+	days as int - number of days
+	method as tuple - args of TimeCalculator.method
+	h as number - altitude/height in meters
+
+	Return:
+	list of list of 3-tuple - for each time (indexed by salat.FAJR, etc),
+		consecutive dates as first date, last date, and BEFORE or AFTER
+	"""
+	dates = [date + datetime.timedelta(i) for i in range(days)]
+	classes = grid((lat,), dates, method, h)[0]
+	result = []
+	for i in range(salat.N):
+		cls = classes[:, i]
+		# indices where the class changes
+		edges = np.flatnonzero(np.diff(cls)) + 1
+		starts = np.concatenate(([0], edges))
+		ends = np.concatenate((edges, [days])) - 1
+		result.append([(dates[a], dates[b], int(cls[a]))
+			for a, b in zip(starts, ends) if cls[a] != NORMAL])
+	return result
+
+def _asr_limit(direction, ds, asr_ratio, step=1.0, tolerance=1e-9):
+	"""Return latitude from which Asr is undefined to a pole, or the pole
+
+	Param:
+	direction as int - 1 for north, -1 for south
+	"""
+	def undefined(lat):
+		alt = formula._acot_deg(asr_ratio + formula._tan_deg(abs(ds - lat)))
+		cos_ha = ((formula._sin_deg(alt) - formula._sin_deg(lat)
+			* formula._sin_deg(ds)) / (formula._cos_deg(lat)
+			* formula._cos_deg(ds)))
+		return abs(cos_ha) > 1
+	# find the first undefined step from the equator, then bisect it
+	good = 0.0
+	while True:
+		bad = min(good + step, 90)
+		if undefined(direction * bad): break
+		if bad == 90: return direction * 90
+		good = bad
+	while bad - good > tolerance:
+		mid = (good + bad) / 2
+		if undefined(direction * mid): bad = mid
+		else: good = mid
+	return direction * (good + bad) / 2
+
+def _classify(lats, ds, fajr_angle, isha_angle, asr_ratio, h):
+	lat = lats[:, np.newaxis]
+	ds = ds[np.newaxis, :]
+	horizon = _sign(lat, -0.8333 - 0.0347 * np.sqrt(h), ds)
+	result = np.zeros(lat.shape[:1] + ds.shape[1:] + (salat.N,),
+		dtype=np.int8)
+	# the times before Zuhr are -inf when the hour angle is inf, and vice versa
+	result[..., salat.FAJR] = -_sign(lat, -fajr_angle, ds)
+	result[..., salat.SUNRISE] = -horizon
+	result[..., salat.ASR] = _sign(lat,
+		vformula._acot_deg(asr_ratio + vformula._tan_deg(np.abs(ds - lat))), ds)
+	result[..., salat.MAGHRIB] = horizon
+	result[..., salat.ISHA] = _sign(lat, -isha_angle, ds)
+	# like salat.Times when the Sun does not rise
+	dark = horizon == AFTER
+	result[..., salat.ZUHR][dark] = AFTER
+	result[..., salat.ASR][dark] = AFTER
+	return result
+
+def _sign(lat, alt, ds):
+	"""Return AFTER if hour angle is inf, BEFORE if -inf, else NORMAL"""
+	cos_ha = ((vformula._sin_deg(alt) - vformula._sin_deg(lat)
+		* vformula._sin_deg(ds)) / (vformula._cos_deg(lat)
+		* vformula._cos_deg(ds)))
+	return (cos_ha > 1).astype(np.int8) - (cos_ha < -1)
@@ -48,6 +48,10 @@ import math
 ASR_RATIO_MAJORITY = 1
 ASR_RATIO_HANAFI = 2
 
+# location of the Kaaba in degrees
+KAABA_LAT = 21.42250833
+KAABA_LNG = 39.82616111
+
 
 def zuhr   (lng, tz, et):
 	return 12 + tz - lng / 15.0 - et
@@ -80,6 +84,22 @@ def hour_angle(lat, alt, ds):
 	if cos_ha > 1: return float('inf')
 	return _acos_deg(cos_ha)
 
+def lat_range(alt, ds):
+	"""Return range of latitude where the Sun reaches altitude alt
+
+	hour_angle is -inf or inf outside the range. The Sun's altitude ranges
+	from abs(lat + ds) - 90 (lower culmination) to 90 - abs(lat - ds) (upper
+	culmination), which is symmetric, so lat_range(alt, lat) is also the
+	range of declination for latitude lat. The range is empty (low > high)
+	if alt is beyond the altitude reachable at all.
+
+	Return:
+	number - southern limit in degrees
+	number - northern limit in degrees
+	"""
+	return (max(-90 - alt - ds, ds - 90 + alt),
+		min(90 + alt - ds, ds + 90 - alt))
+
 def eq_time(jd):
 	"""Return Equation of Time in hours"""
 	u = (jd - 2451545) / 36525.0
@@ -115,7 +135,12 @@ def gregorian_to_jd(y, m, d):
 
 	if m <= 2:
 		m += 12; y -= 1
-	if y > 1582 or (y == 1582 and (m > 10 or (m == 10 and d >= 15))):
+	if y > 1582:
+		# integer-only fast path, the same as below
+		a = y // 100
+		return (1720996.5 - a + a // 4 + 1461 * y // 4 + 306 * (m + 1) // 10
+			+ d)
+	if y == 1582 and (m > 10 or (m == 10 and d >= 15)):
 		# first gregorian is 15-oct-1582
 		a = math.floor(y / 100.0)
 		b = 2 + math.floor(a / 4.0) - a
@@ -137,6 +162,18 @@ def jd_to_gregorian(jd):
 	"""
 	if jd < -0.5: raise ValueError('Julian Day < -0.5 is not supported')
 
+	if jd >= 2299160.5:
+		# integer-only fast path for gregorian (Fliegel & Van Flandern)
+		l = int(jd + 0.5) + 68569
+		n = 4 * l // 146097
+		l -= (146097 * n + 3) // 4
+		i = 4000 * (l + 1) // 1461001
+		l += 31 - 1461 * i // 4
+		j = 80 * l // 2447
+		day = l - 2447 * j // 80
+		l = j // 11
+		return (100 * (n - 49) + i + l, j + 2 - 12 * l, day)
+
 	jd1 = jd + 0.5
 	z = math.floor(jd1)
 	f = jd1 - z
@@ -176,13 +213,24 @@ def qibla(lat, lng):
 	Return:
 	number - 0 means north, 90 means east, 270 means west, etc
 	"""
-	lng_a = 39.82616111
-	lat_a = 21.42250833
+	lng_a = KAABA_LNG
+	lat_a = KAABA_LAT
 	deg = _atan2_deg(_sin_deg(lng_a - lng),
 		_cos_deg(lat) * _tan_deg(lat_a)
 		- _sin_deg(lat) * _cos_deg(lng_a - lng))
 	return deg if deg >= 0 else deg + 360
 
+def kaaba_distance(lat, lng):
+	"""Return great-circle distance to the Kaaba in meters
+
+	The Earth is considered as a sphere of the mean radius (haversine).
+	"""
+	lng_a = KAABA_LNG
+	lat_a = KAABA_LAT
+	a = (_sin_deg((lat - lat_a) / 2.0) ** 2
+		+ _cos_deg(lat) * _cos_deg(lat_a) * _sin_deg((lng - lng_a) / 2.0) ** 2)
+	return 2 * 6371008.8 * math.asin(math.sqrt(min(a, 1)))
+
 def _sin_deg(deg):
 	return math.sin(math.radians(deg))
 
@@ -0,0 +1,150 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Convert date to tabular (arithmetic) Islamic calendar and vice versa
+
+Odd months have 30 days and even months have 29 days, except Dhu al-Hijjah
+which has 30 days in leap years. There are 11 leap years in every 30 years,
+which ones depends on the pattern. Unlike ummqura, every date is supported.
+"""
+
+from .. import formula
+import bisect
+import math
+
+
+# leap years in a 30-year cycle
+LEAP_15 = (2, 5, 7, 10, 13, 15, 18, 21, 24, 26, 29)
+LEAP_16 = (2, 5, 7, 10, 13, 16, 18, 21, 24, 26, 29) # the most common
+LEAP_FATIMID = (2, 5, 8, 10, 13, 16, 19, 21, 24, 27, 29)
+LEAP_HABASH = (2, 5, 8, 11, 13, 16, 19, 21, 24, 27, 30)
+
+# Julian Day of 1 Muharram 1 AH
+CIVIL_EPOCH = 1948439.5 # Friday, 16 July 622 (Julian)
+ASTRONOMICAL_EPOCH = 1948438.5 # Thursday, 15 July 622 (Julian)
+
+_CYCLE_DAYS = 30 * 354 + 11
+
+
+class Calendar(object):
+	"""Tabular Islamic calendar of a leap year pattern and epoch
+
+	Conversions are closed-form, using tables of the 30-year cycle which are
+	calculated once.
+	"""
+
+	def __init__(self, leap_years=LEAP_16, epoch=CIVIL_EPOCH):
+		"""Create the calendar
+
+		Param:
+		leap_years as tuple of int - leap years [1..30] in a 30-year cycle,
+			such as LEAP_16
+		epoch as number - Julian Day of 1 Muharram 1 AH, such as CIVIL_EPOCH
+		"""
+		self.leap_years = tuple(leap_years)
+		self.epoch = epoch
+		# days from the start of the cycle to the start of each year
+		self._year_start = [0]
+		for y in range(1, 31):
+			self._year_start.append(
+				self._year_start[-1] + 354 + (y in self.leap_years))
+
+	def is_leap(self, y):
+		"""Return whether year y has 355 days"""
+		return (y - 1) % 30 + 1 in self.leap_years
+
+	def month_len(self, y, m):
+		"""Return number of days in month m of year y"""
+		if m == 12 and self.is_leap(y): return 30
+		return 30 - (m + 1) % 2
+
+	def to_jd(self, y, m, d):
+		"""Return Julian Day of a Hijri date"""
+		cycle, y_cycle = divmod(y - 1, 30)
+		return (self.epoch + cycle * _CYCLE_DAYS + self._year_start[y_cycle]
+			+ (59 * (m - 1) + 1) // 2 + d - 1)
+
+	def from_jd(self, jd):
+		"""Return Hijri date of Julian Day
+
+		Return:
+		int - year
+		int - month [1..12]
+		int - day of month [1..30]
+		int - number of days in the month
+		"""
+		cycle, days = divmod(int(math.floor(jd - self.epoch + 0.5)),
+			_CYCLE_DAYS)
+		y_cycle = bisect.bisect_right(self._year_start, days) - 1
+		yday = days - self._year_start[y_cycle] # from 0
+		m = min(12, -((58 - 2 * yday) // 59) + 1)
+		y = cycle * 30 + y_cycle + 1
+		d = yday - (59 * (m - 1) + 1) // 2 + 1
+		return (y, m, d, self.month_len(y, m))
+
+	def to_gregorian(self, y, m, d):
+		"""Convert to Gregorian date, see formula.jd_to_gregorian
+
+		Param:
+		y as int - year
+		m as int - month [1..12]
+		d as int - day of month [1..30]
+
+		Return:
+		int - year
+		int - month [1..12]
+		int - day of month [1..31]
+		"""
+		return formula.jd_to_gregorian(self.to_jd(y, m, d))
+
+	def from_gregorian(self, y, m, d):
+		"""Convert from Gregorian date, like ummqura.from_gregorian"""
+		return self.from_jd(formula.gregorian_to_jd(y, m, d))
+
+	def to_jd_array(self, y, m, d):
+		"""Like to_jd, but for NumPy arrays (NumPy is needed)"""
+		import numpy as np
+		cycle, y_cycle = np.divmod(np.asarray(y, dtype=np.int64) - 1, 30)
+		m = np.asarray(m, dtype=np.int64)
+		return (self.epoch + cycle * _CYCLE_DAYS
+			+ np.asarray(self._year_start)[y_cycle]
+			+ (59 * (m - 1) + 1) // 2 + np.asarray(d) - 1)
+
+	def from_jd_array(self, jd):
+		"""Like from_jd, but for NumPy arrays (NumPy is needed)
+
+		Return:
+		int array - year
+		int array - month [1..12]
+		int array - day of month [1..30]
+		"""
+		import numpy as np
+		days = np.floor(np.asarray(jd) - self.epoch + 0.5).astype(np.int64)
+		cycle, days = np.divmod(days, _CYCLE_DAYS)
+		year_start = np.asarray(self._year_start)
+		y_cycle = np.searchsorted(year_start, days, side='right') - 1
+		yday = days - year_start[y_cycle]
+		m = np.minimum(12, -((58 - 2 * yday) // 59) + 1)
+		d = yday - (59 * (m - 1) + 1) // 2 + 1
+		return (cycle * 30 + y_cycle + 1, m, d)
+
+
+_default = Calendar()
+
+def to_gregorian(y, m, d):
+	"""Convert to Gregorian date using LEAP_16 and CIVIL_EPOCH"""
+	return _default.to_gregorian(y, m, d)
+
+def from_gregorian(y, m, d):
+	"""Convert from Gregorian date using LEAP_16 and CIVIL_EPOCH"""
+	return _default.from_gregorian(y, m, d)
@@ -11,15 +11,75 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Convert date to Umm al-Qura calendar and vice versa"""
+"""Convert date to Umm al-Qura calendar and vice versa
+
+Month lengths are read from tables, by default only DEFAULT_TABLE (1300-1600
+AH). Other or updated tables, e.g. from official announcements, can be added
+by register_table.
+"""
 
 from .. import formula
+import array
+import bisect
+
+
+class Table(object):
+	"""Month lengths of Umm al-Qura calendar starting from a Hijri year
+
+	Month lengths are packed as bits, bit i % 8 (from the least significant
+	bit) of byte i // 8 is 1 if month i has 30 days, 0 if it has 29 days. Use
+	pack to create it from the lengths.
+
+	Attributes:
+	year as int - Hijri year of the first month (Muharram)
+	jd as int - Julian Day (midday) of the first day of the first month
+	bits as bytes - packed month lengths
+	months as int - number of months
+	month_start as array of int - Julian Day (midday) of the first day of
+		each month, plus the day after the last month
+	"""
+
+	def __init__(self, year, jd, bits, months=None):
+		self.year = year
+		self.jd = jd
+		self.bits = bytes(bits)
+		self.months = len(self.bits) * 8 if months is None else months
+		accu = jd
+		self.month_start = array.array('l', (jd,))
+		for i in range(self.months):
+			accu += self.month_len(i)
+			self.month_start.append(accu)
+
+	def month_len(self, i):
+		"""Return number of days of month index i (from the first month)"""
+		return 29 + ((self.bits[i >> 3] >> (i & 7)) & 1)
+
+	def index(self, jd):
+		"""Return month index of Julian Day (midday), or -1 if not covered"""
+		i = bisect.bisect_right(self.month_start, jd) - 1
+		return i if i < self.months else -1
+
+def pack(month_lengths):
+	"""Return month lengths (29 or 30 each) packed as bits for Table"""
+	month_lengths = list(month_lengths)
+	bits = bytearray((len(month_lengths) + 7) // 8)
+	for i, length in enumerate(month_lengths):
+		if length == 30: bits[i >> 3] |= 1 << (i & 7)
+	return bytes(bits)
 
+def register_table(table):
+	"""Add a table, it takes precedence over the tables added before"""
+	_tables.insert(0, table)
+
+def unregister_table(table):
+	"""Remove a table added by register_table"""
+	_tables.remove(table)
 
 def from_gregorian(y, m, d):
 	"""Convert from Gregorian date
 
-	This is valid only for 1420-1450 AH (April 17 1999 - May 14 2029).
+	By default, this is valid only for 1300-1600 AH (November 12 1882 -
+	November 25 2174), see register_table.
 
 	Param:
 	y as int - year
@@ -32,25 +92,42 @@ def from_gregorian(y, m, d):
 	int - day of month [1..30]
 	int - number of days in the Hijri month
 	"""
-	# valid from 1420 AH (1999-04-17 CE) to 1450 AH (2029-05-14 CE)
 	jd = int(formula.gregorian_to_jd(y, m, d) + 0.5) # jd midday
-	accu = 2451286 # jd of 1999-04-17 midday
-	i = -1
-	while accu <= jd:
-		i += 1
-		accu += _month_len[i] + 29
-	if i == -1: raise IndexError(i)
-	month_start = accu - _month_len[i] - 29
+	t, i = _find(jd)
 	# here i is index where the month we're looking for is
-	h_year = i // 12 + 1420
-	h_month = i % 12 + 1
-	h_day = jd - month_start + 1
-	return (h_year, h_month, h_day, _month_len[i] + 29)
+	return (i // 12 + t.year, i % 12 + 1, jd - t.month_start[i] + 1,
+		t.month_len(i))
+
+def from_gregorian_range(y, m, d, days):
+	"""Convert consecutive days starting from a Gregorian date
+
+	It is like calling from_gregorian for each day, but the month is looked up
+	only once.
+
+	Param:
+	y, m, d - like from_gregorian, the first day
+	days as int - number of days
+
+	Return:
+	generator of 4-tuple - like from_gregorian
+	"""
+	jd = int(formula.gregorian_to_jd(y, m, d) + 0.5)
+	end = jd + days
+	while jd < end:
+		t, i = _find(jd)
+		h_year, h_month = i // 12 + t.year, i % 12 + 1
+		length = t.month_len(i)
+		start = t.month_start[i]
+		stop = min(t.month_start[i + 1], end)
+		for day_jd in range(jd, stop):
+			yield (h_year, h_month, day_jd - start + 1, length)
+		jd = stop
 
 def to_gregorian(y, m, d):
 	"""Convert to Gregorian date
 
-	This is valid only for 1420-1450 AH (April 17 1999 - May 14 2029).
+	By default, this is valid only for 1300-1600 AH (November 12 1882 -
+	November 25 2174), see register_table.
 
 	Param:
 	y as int - year
@@ -62,40 +139,43 @@ def to_gregorian(y, m, d):
 	int - month [1..12]
 	int - day of month [1..31]
 	"""
-	index = (y - 1420) * 12 + m - 1
-	if index < 0 or index > len(_month_len): raise IndexError(index)
-	jd = 2451285.5 + sum(i + 29 for i in _month_len[:index]) + d - 1
+	for t in _tables:
+		index = (y - t.year) * 12 + m - 1
+		if 0 <= index < t.months: break
+	else:
+		# the month right after a table only has its first day known
+		for t in _tables:
+			index = (y - t.year) * 12 + m - 1
+			if index == t.months and d == 1: break
+		else:
+			raise IndexError((y, m, d))
+	jd = t.month_start[index] - 0.5 + d - 1
 	return formula.jd_to_gregorian(jd)
 
-_month_len = (0, 1, 0, 0, 1, 0, 1, 1, 1, 1, 0, 1, 
-	0, 0, 1, 0, 0, 0, 1, 1, 1, 1, 0, 1, 
-	1, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 1, 
-	1, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 
-	1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 1, 0, 
-	1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0, 
-	0, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 1, 
-	0, 0, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 
-	1, 0, 0, 1, 0, 0, 1, 1, 1, 0, 1, 1, 
-	0, 1, 0, 0, 1, 0, 0, 1, 1, 0, 1, 1, 
-	0, 1, 1, 0, 0, 1, 0, 1, 0, 1, 0, 1, 
-	0, 1, 1, 0, 1, 0, 1, 0, 1, 0, 0, 1, 
-	0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 0, 
-	1, 0, 1, 1, 0, 1, 1, 0, 1, 0, 1, 0, 
-	0, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 0, 
-	1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 
-	0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 
-	1, 0, 1, 1, 0, 0, 1, 0, 1, 0, 0, 1, 
-	1, 0, 1, 1, 1, 0, 0, 1, 0, 0, 1, 0, 
-	1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 0, 1, 
-	0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 0, 
-	1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 1, 0, 
-	0, 1, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 
-	1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 
-	0, 1, 0, 1, 1, 0, 0, 1, 0, 1, 0, 1, 
-	0, 1, 1, 1, 0, 1, 0, 0, 1, 0, 0, 1, 
-	0, 1, 1, 1, 0, 1, 1, 0, 0, 1, 0, 0, 
-	1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 
-	0, 1, 0, 1, 1, 0, 1, 1, 0, 1, 0, 1, 
-	0, 0, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 
-	1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 1, 1)
+def _find(jd):
+	"""Return the table and month index of Julian Day (midday)"""
+	for t in _tables:
+		i = t.index(jd)
+		if i >= 0: return t, i
+	raise IndexError(jd)
+
+# 1300-1600 AH, the month lengths of ICU (islamic-umalqura calendar), packed
+# from (1, 0, 1, 0, ...) where 0 means 29 days and 1 means 30 days
+DEFAULT_TABLE = Table(1300, 2408762, bytes.fromhex( # 1882-11-12 midday
+	'55b52a37692b76c53655abaa56e9495da92bb5a53a4b6ba92ed52a6da5b55257'
+	'f28a6ed1565aabb496da925bb24bb6a95a936dd455da4a5da9365597f4926ed4'
+	'966a35d525bda49bb493b62a5ba5add4a5da926daa4ee92a6dc5aed4a66a55d5'
+	'4a3da92bb5a53a556ba92ed5295da5add456ea4a6ed12edaaaaa95da925bb24b'
+	'76c95655abb24dba4a5ba92dd5a5da926dd28eda52ada5baa4977493b6529769'
+	'2dd595bc925bb24dd5295da5add495da54adaa3ad24bbc895ba92dd55a6a4b6d'
+	'c92dd9a66a95aed2566a53b5aada949dd495ba525baa55d59aea926ed255da4a'
+	'6da576b24dda4a6da5b55497f4926ed2566a35b5a6ba925bb28bb6a95aa5adb4'
+	'95da52aba93665277525afd4966a55d52abda49b7495b6525ba92dd5a5da94ad'
+	'b256e92a6ec92ed9aa6a55d64a5dd12bb6c53a556bb24dd6295da5add496ea8a'
+	'6ed14eda4aada6da925b728bb6d15665abb495ba525ba92dd5a6ec946ed495da'
+	'54adaadaa49b7493b654976a2dd5a5ba94abb255d92a5dc52dd9255b55b54a5b'
+	'a92b7a453759ab6a4dd6295da5abb495da4a5dd12dda495ba9d5525b728b76d1'
+	'566aabac96ba525bb12bb6a5da946bd48dda529daa5555977413afe4966a55b5'
+	'a6ba940b'), 3612)
 
+_tables = [DEFAULT_TABLE]
@@ -0,0 +1,76 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sinks of instrumentation of salat.TimeCalculator
+
+A sink is an object having method record(stage, seconds), called after each
+stage of calculation with its duration. It can be set to a TimeCalculator by
+its instrument method, see there for the stages.
+"""
+
+import threading
+
+
+# stages
+EPHEMERIS = 'ephemeris' # declination of the Sun and Equation of Time
+HOUR_ANGLE = 'hour_angle' # times in hours from the ephemeris
+TIMES = 'times' # creating Times
+TIME = 'time' # converting a time to datetime.time (Times.get_time)
+
+
+class Callback(object):
+	"""Sink calling a function as func(stage, seconds)"""
+
+	def __init__(self, func):
+		self.record = func
+
+
+class Aggregator(object):
+	"""Thread-safe sink keeping count, total, maximum, and histogram per stage
+
+	Histogram buckets are powers of 2 in microseconds, bucket b counts the
+	durations d where 2 ** (b - 1) <= d < 2 ** b microseconds (bucket 0 is
+	less than a microsecond).
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._stages = {}
+
+	def record(self, stage, seconds):
+		bucket = int(seconds * 1e6).bit_length()
+		with self._lock:
+			try:
+				s = self._stages[stage]
+			except KeyError:
+				s = self._stages[stage] = {'count': 0, 'total': 0.0, 'max': 0.0,
+					'histogram': {}}
+			s['count'] += 1
+			s['total'] += seconds
+			if seconds > s['max']: s['max'] = seconds
+			s['histogram'][bucket] = s['histogram'].get(bucket, 0) + 1
+
+	def snapshot(self, reset=False):
+		"""Return the statistics as dict of stage to dict
+
+		Each stage has 'count', 'total' (seconds), 'max' (seconds), and
+		'histogram' (dict of bucket to count).
+
+		Param:
+		reset as bool - whether to clear the statistics after that
+		"""
+		with self._lock:
+			result = dict((k, dict(v, histogram=dict(v['histogram'])))
+				for k, v in self._stages.items())
+			if reset: self._stages = {}
+		return result
@@ -15,7 +15,12 @@
 """Qibla direction calculator"""
 
 from . import formula
-from .util import dms, dms_str
+from .util import dms, dms_str, dms_array, dms_str_array
+import array
+import math
+import mmap
+import struct
+import sys
 
 
 def direction(lat, lng):
@@ -39,3 +44,187 @@ def direction_str(lat, lng, prec=0):
 	"""
 	return dms_str(formula.qibla(lat, lng), prec)
 
+
+def distance(lat, lng):
+	return formula.kaaba_distance(lat, lng)
+distance.__doc__ = formula.kaaba_distance.__doc__
+
+def directions(lat, lng):
+	"""Like direction, but for arrays of lat and lng (NumPy is needed)
+
+	Param:
+	lat, lng as NumPy array or buffer (e.g. array.array) of number
+
+	Return:
+	NumPy array of float
+	"""
+	from . import vformula
+	return vformula.qibla(_as_array(lat), _as_array(lng))
+
+def directions_dms(lat, lng):
+	"""Like direction_dms, but for arrays, see directions
+
+	Return:
+	3-tuple of NumPy array - degree, arc minute, and arc second
+	"""
+	return dms_array(directions(lat, lng))
+
+def directions_str(lat, lng, prec=0):
+	"""Like direction_str, but for arrays, see directions
+
+	Return:
+	NumPy array of str
+	"""
+	return dms_str_array(directions(lat, lng), prec)
+
+def distances(lat, lng):
+	"""Like distance, but for arrays, see directions"""
+	from . import vformula
+	return vformula.kaaba_distance(_as_array(lat), _as_array(lng))
+
+def _as_array(x):
+	import numpy as np
+	if isinstance(x, (bytes, bytearray)): return np.frombuffer(x)
+	return np.asarray(x, dtype=float)
+
+# Grid file layout, all little-endian: magic, resolution in degrees, number of
+# rows (latitudes) and columns (longitudes), then the directions as 32-bit
+# floats, row by row from latitude -90 and longitude -180
+_MAGIC = b'ICLIBQBL'
+_HEADER = struct.Struct('<8sdII')
+
+class Grid(object):
+	"""Qibla directions precomputed on a grid, bilinearly interpolated
+
+	Rows are latitudes from -90 to 90 and columns are longitudes from -180 to
+	180 (both inclusive, so the antimeridian needs no special case), spaced by
+	the resolution. Directions are interpolated on the circle, so 359 and 1
+	degrees interpolate through 0.
+
+	Near the Kaaba and its antipode the direction changes too fast to be
+	interpolated, so within exact_radius degrees (latitude and longitude
+	distance) from them formula.qibla is used instead. The interpolation
+	error there grows like (resolution / distance) ** 2, so with the default
+	exact_radius of 20 times the resolution it is less than 0.013 degree
+	(about 45 arc seconds) for any resolution, the largest being just outside
+	the exact area. Elsewhere it is much smaller. See max_error.
+	"""
+
+	def __init__(self, resolution=0.5, exact_radius=None, _values=None):
+		"""Calculate the grid
+
+		Param:
+		resolution as number - degrees between rows and between columns,
+			180 must be divisible by it
+		exact_radius as number - see the class, default is 20 * resolution
+		"""
+		self.resolution = resolution
+		self.exact_radius = (20 * resolution if exact_radius is None
+			else exact_radius)
+		self._rows = int(round(180.0 / resolution)) + 1
+		self._cols = int(round(360.0 / resolution)) + 1
+		if _values is None:
+			_values = array.array('f', (formula.qibla(
+				-90 + i * resolution, -180 + j * resolution)
+				for i in range(self._rows) for j in range(self._cols)))
+		self._values = _values
+
+	@classmethod
+	def load(cls, path, exact_radius=None):
+		"""Return grid read from a file written by save
+
+		The file is memory-mapped read-only (except on big-endian machines)
+		so processes reading the same file share its pages.
+		"""
+		with open(path, 'rb') as f:
+			data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, resolution, rows, cols = _HEADER.unpack_from(data)
+		if magic != _MAGIC:
+			data.close()
+			raise ValueError('not a qibla grid: ' + path)
+		if sys.byteorder == 'little':
+			values = memoryview(data)[_HEADER.size:].cast('f')
+		else:
+			values = array.array('f', data[_HEADER.size:])
+			values.byteswap()
+			data.close()
+		grid = cls(resolution, exact_radius, values)
+		assert (grid._rows, grid._cols) == (rows, cols)
+		return grid
+
+	def save(self, path):
+		"""Write the grid to a file to be read by load"""
+		values = array.array('f', self._values)
+		if sys.byteorder == 'big': values.byteswap()
+		with open(path, 'wb') as f:
+			f.write(_HEADER.pack(_MAGIC, self.resolution, self._rows,
+				self._cols))
+			f.write(values.tobytes())
+
+	def direction(self, lat, lng):
+		"""Return qibla direction like formula.qibla"""
+		lng = (lng + 180) % 360 - 180
+		r = self.exact_radius
+		d_lat = lat - formula.KAABA_LAT
+		d_lng = (lng - formula.KAABA_LNG + 180) % 360 - 180
+		if ((abs(d_lat) < r or abs(lat + formula.KAABA_LAT) < r) and
+				(abs(d_lng) < r or 180 - abs(d_lng) < r)):
+			return formula.qibla(lat, lng)
+		x = (lng + 180) / self.resolution
+		y = (lat + 90) / self.resolution
+		j = min(int(x), self._cols - 2)
+		i = min(int(y), self._rows - 2)
+		fx = x - j
+		fy = y - i
+		k = i * self._cols + j
+		values = self._values
+		v00 = values[k]
+		v01 = _near(values[k + 1], v00)
+		v10 = _near(values[k + self._cols], v00)
+		v11 = _near(values[k + self._cols + 1], v00)
+		deg = ((v00 * (1 - fx) + v01 * fx) * (1 - fy)
+			+ (v10 * (1 - fx) + v11 * fx) * fy)
+		return deg % 360
+
+	def max_error(self, step=None):
+		"""Return maximum difference from formula.qibla in degrees
+
+		The error is the largest just outside the exact areas, so it is
+		measured there on a step x step lattice aligned with the grid (default
+		is resolution / 8) in a band of twice the resolution around the exact
+		areas of the Kaaba and its antipode. Elsewhere it is measured at the
+		middle of each cell.
+		"""
+		res = self.resolution
+		step = step or res / 8.0
+		error = 0
+		for i in range(int(round(180.0 / res))):
+			lat = -90 + (i + 0.5) * res
+			for j in range(int(round(360.0 / res))):
+				error = max(error, self._error(lat, -180 + (j + 0.5) * res))
+		r = self.exact_radius
+		outer = r + 2 * res
+		for lat0, lng0 in ((formula.KAABA_LAT, formula.KAABA_LNG),
+				(-formula.KAABA_LAT, formula.KAABA_LNG - 180)):
+			# aligned with the grid, so it has the middles and edges of cells
+			i0 = int(math.floor(max(lat0 - outer, -90) / step))
+			i1 = int(math.ceil(min(lat0 + outer, 90) / step))
+			j0 = int(math.floor((lng0 - outer) / step))
+			j1 = int(math.ceil((lng0 + outer) / step))
+			for i in range(i0, i1 + 1):
+				lat = i * step
+				for j in range(j0, j1 + 1):
+					lng = j * step
+					if abs(lat - lat0) < r and abs(lng - lng0) < r: continue
+					error = max(error, self._error(lat, lng))
+		return error
+
+	def _error(self, lat, lng):
+		diff = abs(self.direction(lat, lng) - formula.qibla(lat, lng))
+		return min(diff, 360 - diff)
+
+def _near(deg, ref):
+	"""Return deg plus or minus 360 so that it is within 180 of ref"""
+	if deg - ref > 180: return deg - 360
+	if ref - deg > 180: return deg + 360
+	return deg
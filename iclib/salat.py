@@ -14,10 +14,17 @@
 """Prayer times calculator"""
 
 from . import formula
+from . import ephemeris
+from . import timezone
+from . import instrument as _instrument
 from .util import hms, hm
 import datetime
 import math
 import collections
+import array
+import heapq
+import itertools
+import time
 
 
 STANDARD_ANGLES = {
@@ -32,9 +39,20 @@ STANDARD_ANGLES = {
 N = 6
 FAJR, SUNRISE, ZUHR, ASR, MAGHRIB, ISHA = range(N)
 
+# rules for high latitudes, see TimeCalculator.high_latitude
+NEAREST_LATITUDE = 'nearest_latitude'
+MIDDLE_OF_NIGHT = 'middle_of_night'
+ONE_SEVENTH = 'one_seventh'
+ANGLE_BASED = 'angle_based'
+
 
 class TimeCalculator(object):
 
+	_sun = staticmethod(ephemeris.sun)
+	_sink = None
+	high_lat = None
+	zone = None
+
 	def method(self, angle, asr_ratio=None, adjustments={ZUHR: 2.0/60}):
 		"""Set method and adjustment of calculation
 
@@ -64,6 +82,30 @@ class TimeCalculator(object):
 		self.adjustments = tuple(adjustments.get(k, 0) for k in range(N))
 		return self
 
+	def high_latitude(self, rule):
+		"""Set the rule for times which cannot be calculated
+
+		Near the poles, the Sun may not reach the altitude of some times in
+		some days (they are -inf or inf without a rule). With NEAREST_LATITUDE,
+		those times are calculated at the nearest latitude where the Sun
+		reaches the altitude on that day. With MIDDLE_OF_NIGHT, ONE_SEVENTH,
+		or ANGLE_BASED, Fajr is at most a portion of the night before sunrise
+		and Isha is at most that portion after Maghrib, where the portion is
+		1/2, 1/7, or the angle / 60 respectively, and the night is from
+		Maghrib to sunrise. Other times are calculated by NEAREST_LATITUDE.
+		The times are kept in order, and Fajr may be before midnight or Isha
+		after it, which Times.get_time then shows as the clock time (see
+		Times.wrap).
+
+		Param:
+		rule - one of the above, or None to leave them -inf or inf
+
+		Return:
+		self for chaining
+		"""
+		self.high_lat = rule
+		return self
+
 	def location(self, lat, lng, h, tz):
 		"""Set the location
 
@@ -71,7 +113,9 @@ class TimeCalculator(object):
 		lat as number - latitude in degrees
 		lng as number - longitude in degrees
 		h as number - altitude/height of the place in meters
-		tz as number - timezone in hours, x means UTC+x
+		tz as number - timezone in hours, x means UTC+x, or datetime.tzinfo
+			(e.g. zoneinfo.ZoneInfo) whose offset is resolved for each date,
+			see module timezone
 
 		Return:
 		self for chaining
@@ -79,12 +123,51 @@ class TimeCalculator(object):
 		self.lat = lat
 		self.lng = lng
 		self.h = h
-		if isinstance(tz, datetime.tzinfo):
-			self.tz = tz.utcoffset(None).total_seconds() / 3600.0
+		tz = _tz_hours(tz)
+		if isinstance(tz, timezone.Zone):
+			self.zone = tz
+			if hasattr(self, 'jd'): self.tz = tz.offset(self.jd)
 		else:
+			self.zone = None
 			self.tz = tz
 		return self
 
+	def ephemeris(self, provider):
+		"""Set the provider of the Sun's ephemeris
+
+		By default the formula is evaluated for every date, a provider such as
+		ephemeris.Cache can be shared by several calculators to avoid that.
+
+		Param:
+		provider - object having method sun(jd), see module ephemeris, or None
+			for the default
+
+		Return:
+		self for chaining
+		"""
+		if provider is None:
+			self._sun = ephemeris.sun
+		else:
+			self._sun = provider.sun
+		return self
+
+	def instrument(self, sink):
+		"""Set the sink of instrumentation, see module instrument
+
+		When set, calculate and calculate_raw record the duration of stages
+		EPHEMERIS, HOUR_ANGLE, and TIMES (only calculate), and the Times
+		created record TIME for each get_time (also used by its iteration and
+		properties). Without a sink, the cost is only a check.
+
+		Param:
+		sink - object having method record(stage, seconds), or None to disable
+
+		Return:
+		self for chaining
+		"""
+		self._sink = sink
+		return self
+
 	def date(self, date):
 		"""Set the date
 
@@ -95,6 +178,7 @@ class TimeCalculator(object):
 		self for chaining
 		"""
 		self.jd = formula.gregorian_to_jd(date.year, date.month, date.day)
+		if self.zone is not None: self.tz = self.zone.offset(self.jd)
 		return self
 
 	def gregorian_date(self, y, m, d):
@@ -109,13 +193,21 @@ class TimeCalculator(object):
 		self for chaining
 		"""
 		self.jd = formula.gregorian_to_jd(y, m, d)
+		if self.zone is not None: self.tz = self.zone.offset(self.jd)
 		return self
 
 	def date_relative(self, days):
 		"""Add the date by days"""
 		self.jd += days
+		if self.zone is not None: self.tz = self.zone.offset(self.jd)
 		return self
 
+	def config(self):
+		"""Return the method and location set as Config"""
+		return Config(self.fajr_angle, self.isha_angle, self.asr_ratio,
+			self.adjustments, self.lat, self.lng, self.h,
+			self.tz if self.zone is None else self.zone, self.high_lat)
+
 	def calculate(self):
 		"""Calculate the prayer times
 		
@@ -125,29 +217,387 @@ class TimeCalculator(object):
 		Return:
 		result as Times
 		"""
+		if self._sink is not None:
+			return self._calculate_instrumented(True)
 		# julian day of local midday (minus timezone, plus 12 hours)
 		jd = formula.adjust_jd_hour(self.jd, -self.tz + 12)
-		ds = formula.decl_sun(jd)
-		transit = formula.zuhr(self.lng, self.tz, formula.eq_time(jd))
-		lat = self.lat
-		return Times([i + adj for i,adj in zip(
-			(
-			formula.fajr   (transit, lat, ds, self.fajr_angle),
-			formula.sunrise(transit, lat, ds, self.h),
-			transit,
-			formula.asr    (transit, lat, ds, self.asr_ratio),
-			formula.maghrib(transit, lat, ds, self.h),
-			formula.isha   (transit, lat, ds, self.isha_angle)),
-			self.adjustments)])
+		ds, et = self._sun(jd)
+		transit = formula.zuhr(self.lng, self.tz, et)
+		return Times(_solve(self, transit, self.lat, ds, self.h),
+			self.high_lat is not None)
+
+	def calculate_raw(self):
+		"""Calculate the prayer times without creating Times
+
+		Return:
+		result as RawTimes - times in hours, -inf or inf if they cannot be
+			calculated
+		"""
+		if self._sink is not None:
+			return self._calculate_instrumented(False)
+		jd = formula.adjust_jd_hour(self.jd, -self.tz + 12)
+		ds, et = self._sun(jd)
+		return RawTimes._make(_solve(self,
+			formula.zuhr(self.lng, self.tz, et), self.lat, ds, self.h))
+
+	def _calculate_instrumented(self, to_times):
+		"""Like calculate (or calculate_raw), recording to the sink"""
+		sink = self._sink
+		t0 = time.perf_counter()
+		ds, et = self._sun(formula.adjust_jd_hour(self.jd, -self.tz + 12))
+		t1 = time.perf_counter()
+		sink.record(_instrument.EPHEMERIS, t1 - t0)
+		times = _solve(self, formula.zuhr(self.lng, self.tz, et), self.lat,
+			ds, self.h)
+		t2 = time.perf_counter()
+		sink.record(_instrument.HOUR_ANGLE, t2 - t1)
+		if not to_times:
+			return RawTimes._make(times)
+		result = Times(times, self.high_lat is not None)
+		result._sink = sink
+		sink.record(_instrument.TIMES, time.perf_counter() - t2)
+		return result
+
+	def iter_days(self, days=None):
+		"""Calculate the prayer times of consecutive days lazily
+
+		It starts from the date set and does not change it. Without an
+		ephemeris provider set, the Sun's ephemeris is advanced day by day by
+		ephemeris.daily instead of calculated from scratch. The result
+		differs from calculate by far less than a second.
+
+		Param:
+		days as int - number of days, None means infinite
+
+		Return:
+		generator of Times
+		"""
+		# later changes to self do not matter
+		config, sun, jd = self.config(), self._sun, self.jd
+		return itertools.chain.from_iterable(
+			_iter_days(config, sun, jd + start,
+				None if stop is None else stop - start, tz)
+			for start, stop, tz in self._segments(jd, days))
+
+	def events(self, after):
+		"""Generate the prayer times after an instant, in order
+
+		It calculates lazily a day at a time like iter_days, from the date of
+		the instant (the date set does not matter and is not changed). Times
+		which cannot be calculated are skipped, and it stops if there is none
+		in a year.
+
+		Param:
+		after as datetime.datetime - the instant, naive means local time of
+			the location
+
+		Return:
+		generator of 2-tuple - name (like RawTimes fields, e.g. 'fajr') and
+			datetime.datetime having the timezone of the location
+		"""
+		if self.zone is None:
+			tzinfo = datetime.timezone(datetime.timedelta(hours=self.tz))
+		else:
+			tzinfo = self.zone.tzinfo
+		if after.tzinfo is None: after = after.replace(tzinfo=tzinfo)
+		# Isha of the previous date can be after midnight
+		first = after.astimezone(tzinfo).date() - datetime.timedelta(1)
+		jd = formula.gregorian_to_jd(first.year, first.month, first.day)
+		return _events(self.config(), self._sun, jd, self._segments(jd, None),
+			after, tzinfo)
+
+	def next_events(self, after, n):
+		"""Return list of the first n of events(after)"""
+		return list(itertools.islice(self.events(after), n))
+
+	def _segments(self, jd, days):
+		"""Return runs of days having the same timezone, see Zone.segments"""
+		if self.zone is None:
+			return ((0, days, self.tz),)
+		return self.zone.segments(jd, days)
+
+	def calculate_range(self, days):
+		"""Calculate the prayer times of several consecutive days
+
+		It starts from the date set and does not change it. The result is the
+		same as calling calculate and date_relative(1) for each day, but
+		stored in columns instead of a Times per day. With a timezone having
+		transitions, the days are split only where its offset changes.
+
+		Param:
+		days as int - number of days
+
+		Return:
+		result as TimeTable
+		"""
+		table = TimeTable(self.jd, days, self.high_lat is not None)
+		for start, stop, tz in self._segments(self.jd, days):
+			self._calculate_segment(table.times, start, stop, tz)
+		return table
+
+	def _calculate_segment(self, cols, start, stop, tz):
+		"""Calculate days [start, stop) of calculate_range into columns"""
+		# timezone and longitude only shift the transit, do it once
+		midday = -tz + 12
+		transit0 = formula.zuhr(self.lng, tz, 0)
+		lat, h = self.lat, self.h
+		fajr_angle, isha_angle = self.fajr_angle, self.isha_angle
+		asr_ratio = self.asr_ratio
+		adj = self.adjustments
+		sun = self._sun
+		for i in range(start, stop):
+			ds, et = sun(formula.adjust_jd_hour(self.jd + i, midday))
+			transit = transit0 - et
+			if self.high_lat is not None:
+				for col, t in zip(cols, _solve(self, transit, lat, ds, h)):
+					col[i] = t
+				continue
+			t_sunrise = formula.sunrise(transit, lat, ds, h) + adj[SUNRISE]
+			t_maghrib = formula.maghrib(transit, lat, ds, h) + adj[MAGHRIB]
+			cols[FAJR][i] = (
+				formula.fajr(transit, lat, ds, fajr_angle) + adj[FAJR])
+			cols[SUNRISE][i] = t_sunrise
+			cols[MAGHRIB][i] = t_maghrib
+			cols[ISHA][i] = (
+				formula.isha(transit, lat, ds, isha_angle) + adj[ISHA])
+			if t_sunrise == -inf or t_maghrib == inf:
+				cols[ZUHR][i] = inf
+				cols[ASR][i] = inf
+			else:
+				cols[ZUHR][i] = transit + adj[ZUHR]
+				cols[ASR][i] = (
+					formula.asr(transit, lat, ds, asr_ratio) + adj[ASR])
+
+	def calculate_many(self, locations, dates=None):
+		"""Calculate the prayer times of many locations
+
+		Sun's declination and Equation of Time are calculated once per date
+		and timezone, then shared by all of the locations having that
+		timezone. The method set is used, but the location set is not.
+
+		Param:
+		locations as iterable of 4-tuple - lat, lng, h, and tz like in
+			location(self, lat, lng, h, tz)
+		dates as iterable of datetime.date - the date set if None
+
+		Return:
+		generator of 8-tuple - date index, location index, then the times in
+			hours (Fajr, sunrise, Zuhr, Asr, Maghrib, Isha) which are -inf or
+			inf if they cannot be calculated
+		"""
+		if dates is None:
+			jds = (self.jd,)
+		else:
+			jds = [formula.gregorian_to_jd(d.year, d.month, d.day) for d in dates]
+		locations = [(lat, lng, h, _tz_hours(tz))
+			for lat, lng, h, tz in locations]
+		for i_date, jd in enumerate(jds):
+			suns = {}
+			for i_loc, (lat, lng, h, tz) in enumerate(locations):
+				if isinstance(tz, timezone.Zone): tz = tz.offset(jd)
+				try:
+					ds, et = suns[tz]
+				except KeyError:
+					ds, et = suns[tz] = self._sun(
+						formula.adjust_jd_hour(jd, -tz + 12))
+				times = _solve(self, formula.zuhr(lng, tz, et), lat, ds, h)
+				yield (i_date, i_loc) + tuple(times)
 
 inf = float('inf')
 
+class Config(collections.namedtuple('Config', ('fajr_angle', 'isha_angle',
+		'asr_ratio', 'adjustments', 'lat', 'lng', 'h', 'tz', 'high_lat'),
+		defaults=(None,))):
+	"""Immutable method and location, see TimeCalculator.config
+
+	Unlike TimeCalculator, it can be shared between threads and used as a
+	dict key, and the date is given when calculating. Its tz is a number or a
+	timezone.Zone.
+	"""
+	__slots__ = ()
+
+	def calculator(self):
+		"""Return a new TimeCalculator having this method and location"""
+		c = TimeCalculator()
+		c.fajr_angle, c.isha_angle, c.asr_ratio, c.adjustments = self[:4]
+		c.high_lat = self.high_lat
+		return c.location(self.lat, self.lng, self.h, self.tz)
+
+	def calculate(self, date, sun=ephemeris.sun):
+		"""Calculate the prayer times of a date
+
+		Param:
+		date as datetime.date
+		sun as function - sun function of an ephemeris provider
+
+		Return:
+		result as Times
+		"""
+		return Times(list(self.calculate_raw(date, sun)),
+			self.high_lat is not None)
+
+	def calculate_raw(self, date, sun=ephemeris.sun):
+		"""Like calculate, but return RawTimes"""
+		jd = formula.gregorian_to_jd(date.year, date.month, date.day)
+		return self._calculate_jd(jd, sun)
+
+	def calculate_dates(self, dates, sun=ephemeris.sun):
+		"""Like calculate_raw, but for each date of an iterable"""
+		for date in dates:
+			yield self.calculate_raw(date, sun)
+
+	def _calculate_jd(self, jd, sun):
+		tz = self.tz
+		if isinstance(tz, timezone.Zone): tz = tz.offset(jd)
+		ds, et = sun(formula.adjust_jd_hour(jd, -tz + 12))
+		return RawTimes._make(_solve(self,
+			formula.zuhr(self.lng, tz, et), self.lat, ds, self.h))
+
+RawTimes = collections.namedtuple('RawTimes',
+	('fajr', 'sunrise', 'zuhr', 'asr', 'maghrib', 'isha'))
+RawTimes.__doc__ = """Result of TimeCalculator.calculate_raw, times in hours
+
+It is a tuple, so it can also be indexed by ZUHR, ASR, etc.
+"""
+
+def _iter_days(config, sun, jd, days, tz):
+	"""Generate Times of TimeCalculator.iter_days having the same timezone"""
+	jd = formula.adjust_jd_hour(jd, -tz + 12)
+	if sun is ephemeris.sun:
+		suns = ephemeris.daily(jd, days)
+	else:
+		suns = (sun(jd + i) for i in (
+			range(days) if days is not None else itertools.count()))
+	transit0 = formula.zuhr(config.lng, tz, 0)
+	wrap = config.high_lat is not None
+	return (Times(_solve(config, transit0 - et, config.lat, ds, config.h), wrap)
+		for ds, et in suns)
+
+def _events(config, sun, jd, segments, after, tzinfo):
+	"""Generate TimeCalculator.events from Julian Day jd"""
+	pending = [] # heap of (datetime, index)
+	empty_days = 0
+	for start, stop, tz in segments:
+		offset = datetime.timezone(datetime.timedelta(hours=tz))
+		days = _iter_days(config, sun, jd + start,
+			None if stop is None else stop - start, tz)
+		for i, times in enumerate(days, start):
+			y, m, d = formula.jd_to_gregorian(jd + i)
+			midnight = datetime.datetime(y, m, d, tzinfo=offset)
+			day = sorted((midnight + datetime.timedelta(hours=t), k)
+				for k, t in enumerate(times.times) if not math.isinf(t))
+			if not day:
+				empty_days += 1
+				if empty_days > 366: return
+				continue
+			empty_days = 0
+			# the times of the later dates are not earlier than this one
+			while pending and pending[0] <= day[0]:
+				t, k = heapq.heappop(pending)
+				if t > after: yield RawTimes._fields[k], t.astimezone(tzinfo)
+			for event in day:
+				heapq.heappush(pending, event)
+
+def _solve(m, transit, lat, ds, h):
+	"""Return list of adjusted times, m has the attributes set by method"""
+	times = [
+		formula.fajr   (transit, lat, ds, m.fajr_angle),
+		formula.sunrise(transit, lat, ds, h),
+		transit,
+		formula.asr    (transit, lat, ds, m.asr_ratio),
+		formula.maghrib(transit, lat, ds, h),
+		formula.isha   (transit, lat, ds, m.isha_angle)]
+	if m.high_lat is not None:
+		_high_latitude(m, times, transit, lat, ds, h)
+	times = [i + adj for i,adj in zip(times, m.adjustments)]
+	if m.high_lat is not None:
+		# keep the order, e.g. Maghrib near the transit in polar night must not
+		# be before the adjusted Zuhr
+		for i in range(1, N):
+			if times[i] < times[i - 1]: times[i] = times[i - 1]
+	if times[SUNRISE] == -inf or times[MAGHRIB] == inf:
+		times[ZUHR] = inf
+		times[ASR] = inf
+	return times
+
+def _high_latitude(m, times, transit, lat, ds, h):
+	"""Replace -inf and inf in times (not adjusted yet) by m.high_lat rule"""
+	portion = None
+	if m.high_lat == MIDDLE_OF_NIGHT:
+		portion = (0.5, 0.5)
+	elif m.high_lat == ONE_SEVENTH:
+		portion = (1 / 7.0, 1 / 7.0)
+	elif m.high_lat == ANGLE_BASED:
+		portion = (m.fajr_angle / 60.0, m.isha_angle / 60.0)
+	# the same as in formula
+	alt_horizon = -0.8333 - 0.0347 * math.sqrt(h)
+	if math.isinf(times[SUNRISE]):
+		times[SUNRISE] = formula.sunrise(transit,
+			_nearest_lat(lat, alt_horizon, ds), ds, h)
+	if math.isinf(times[MAGHRIB]):
+		times[MAGHRIB] = formula.maghrib(transit,
+			_nearest_lat(lat, alt_horizon, ds), ds, h)
+	if math.isinf(times[ASR]):
+		# the Sun reaches the Asr altitude if it is above the horizon at midday
+		asr_lat = min(max(lat, ds - 89.999), ds + 89.999)
+		alt = formula._acot_deg(m.asr_ratio + formula._tan_deg(abs(ds - asr_lat)))
+		times[ASR] = formula.asr(transit, _nearest_lat(asr_lat, alt, ds), ds,
+			m.asr_ratio)
+	# Asr is at another latitude than sunrise and Maghrib, or finite when the
+	# Sun does not rise, keep it between Zuhr and Maghrib
+	times[ASR] = min(max(times[ASR], transit), times[MAGHRIB])
+	if portion is None:
+		if math.isinf(times[FAJR]):
+			times[FAJR] = formula.fajr(transit,
+				_nearest_lat(lat, -m.fajr_angle, ds), ds, m.fajr_angle)
+		if math.isinf(times[ISHA]):
+			times[ISHA] = formula.isha(transit,
+				_nearest_lat(lat, -m.isha_angle, ds), ds, m.isha_angle)
+		return
+	night = 24 - (times[MAGHRIB] - times[SUNRISE])
+	fajr_limit = times[SUNRISE] - portion[0] * night
+	if math.isinf(times[FAJR]) or times[FAJR] < fajr_limit:
+		times[FAJR] = fajr_limit
+	isha_limit = times[MAGHRIB] + portion[1] * night
+	if math.isinf(times[ISHA]) or times[ISHA] > isha_limit:
+		times[ISHA] = isha_limit
+
+def _nearest_lat(lat, alt, ds):
+	"""Return the latitude nearest to lat where the Sun reaches altitude alt
+
+	See formula.lat_range, alt must be reachable at some latitude.
+	"""
+	low, high = formula.lat_range(alt, ds)
+	margin = 1e-6 # to be safe from rounding error
+	return min(max(lat, low + margin), high - margin)
+
+def _tz_hours(tz):
+	"""Return timezone as number of hours, or timezone.Zone if not fixed
+
+	tz can be datetime.tzinfo, which is fixed if it has an offset without a
+	date (like datetime.timezone).
+	"""
+	if isinstance(tz, datetime.tzinfo):
+		offset = tz.utcoffset(None)
+		if offset is None: return timezone.get(tz)
+		return offset.total_seconds() / 3600.0
+	return tz
+
 class Times(object):
-	"""Result of TimeCalculator"""
+	"""Result of TimeCalculator
 
-	def __init__(self, times):
+	Attributes:
+	times as list of number - times in hours, indexed by ZUHR, ASR, etc
+	use_second as bool - whether get_time includes seconds
+	wrap as bool - whether get_time wraps hours out of the day, see there
+	"""
+
+	_sink = None
+
+	def __init__(self, times, wrap=False):
 		self.times = times
 		self.use_second = False
+		self.wrap = wrap
 		if times[SUNRISE] == -inf or times[MAGHRIB] == inf:
 			times[ZUHR] = inf
 			times[ASR] = inf
@@ -155,17 +605,28 @@ class Times(object):
 	def get_time(self, i):
 		"""Return the time as datetime.time
 
-		The value of self.use_second is considered.
+		The value of self.use_second is considered. A time before 0 or from 24
+		hours (in the previous or next day) raises ValueError, unless
+		self.wrap is true, which is the case for results of a high latitude
+		rule (see TimeCalculator.high_latitude). Then it is the clock time in
+		that day, e.g. -0.25 hours is 23:45.
 
 		Param:
 		i as int - ZUHR, ASR, etc
 		"""
-		# negative hours will raise exception
-		try:
-			if self.use_second: return datetime.time(*self.get_hms(i))
-			else: return datetime.time(*self.get_hm(i))
-		except TypeError:
-			return None
+		if self._sink is not None:
+			t0 = time.perf_counter()
+			result = self._get_time(i)
+			self._sink.record(_instrument.TIME, time.perf_counter() - t0)
+			return result
+		return self._get_time(i)
+
+	def _get_time(self, i):
+		t = self.get_hms(i) if self.use_second else self.get_hm(i)
+		if t is None: return None
+		# negative hours will raise exception, unless wrapped
+		if self.wrap: t = (t[0] % 24,) + t[1:]
+		return datetime.time(*t)
 
 	def get_hms(self, i):
 		"""Return the time as 3-tuple of hour-minute-second
@@ -186,10 +647,40 @@ class Times(object):
 	def __iter__(self):
 		return iter(self.get_time(i) for i in range(len(self.times)))
 
-	_names = ('fajr', 'sunrise', 'zuhr', 'asr', 'maghrib', 'isha')
-	def __getattr__(self, name):
-		if name in self._names:
-			return self.get_time(self._names.index(name))
-		else:
-			raise AttributeError("'{}' object has no attribute '{}'".
-				format(self.__class__.__name__, name))
+	_names = RawTimes._fields
+
+def _time_property(i):
+	return property(lambda self: self.get_time(i),
+		doc='Like get_time(self, {})'.format(RawTimes._fields[i].upper()))
+
+# fajr, sunrise, etc as properties, resolved once instead of on every access
+for _i, _name in enumerate(Times._names):
+	setattr(Times, _name, _time_property(_i))
+del _i, _name
+
+
+class TimeTable(object):
+	"""Result of TimeCalculator.calculate_range
+
+	Attributes:
+	jd as array of float - Julian Day of each date (the date axis)
+	times as list of array of float - times in hours, indexed by ZUHR, ASR,
+		etc then by day, e.g. times[ASR][0] is Asr of the first day
+	wrap as bool - like Times.wrap
+	"""
+
+	def __init__(self, jd, days, wrap=False):
+		self.jd = array.array('d', (jd + i for i in range(days)))
+		self.times = [array.array('d', bytes(8 * days)) for _ in range(N)]
+		self.wrap = wrap
+
+	def __len__(self):
+		return len(self.jd)
+
+	def date(self, day):
+		"""Return the date of a day index as datetime.date"""
+		return datetime.date(*formula.jd_to_gregorian(self.jd[day]))
+
+	def get_times(self, day):
+		"""Return the times of a day index as Times"""
+		return Times([col[day] for col in self.times], self.wrap)
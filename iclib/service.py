@@ -0,0 +1,119 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Prayer times for asyncio applications"""
+
+import asyncio
+import collections
+import functools
+import time
+
+
+class TimeService(object):
+	"""Asynchronous prayer times calculation with coalescing and cache
+
+	Calculations run in an executor so the event loop is never blocked.
+	Concurrent requests of the same (config, date) share one calculation, and
+	the result is cached for ttl seconds. Results are shared between callers,
+	so they are immutable (salat.RawTimes and salat.TimeTable must not be
+	changed).
+
+	Attributes:
+	hits as int - requests answered from the cache
+	misses as int - requests which started a calculation
+	coalesced as int - requests which waited for a calculation started by
+		another request
+	"""
+
+	def __init__(self, ttl=3600, size=100000, executor=None,
+			clock=time.monotonic):
+		"""Create the service
+
+		Param:
+		ttl as number - seconds a result is cached
+		size as int - maximum number of cached results, the oldest is
+			evicted first
+		executor - concurrent.futures.Executor, None means the default of the
+			event loop
+		clock as function - returns current time in seconds
+		"""
+		self.ttl = ttl
+		self.size = size
+		self.executor = executor
+		self.clock = clock
+		self.hits = 0
+		self.misses = 0
+		self.coalesced = 0
+		self._cache = collections.OrderedDict()
+		self._pending = {}
+
+	async def calculate(self, config, date):
+		"""Calculate the prayer times of a date
+
+		Param:
+		config as salat.Config - method and location
+		date as datetime.date
+
+		Return:
+		result as salat.RawTimes
+		"""
+		return await self._get((config, date), config.calculate_raw, date)
+
+	async def calculate_range(self, config, date, days):
+		"""Calculate the prayer times of consecutive days
+
+		Param:
+		config as salat.Config - method and location
+		date as datetime.date - first date
+		days as int - number of days
+
+		Return:
+		result as salat.TimeTable
+		"""
+		return await self._get((config, date, days), _calculate_range,
+			config, date, days)
+
+	def clear(self):
+		"""Remove all cached results and reset the counters"""
+		self._cache.clear()
+		self.hits = self.misses = self.coalesced = 0
+
+	async def _get(self, key, func, *args):
+		entry = self._cache.get(key)
+		if entry is not None:
+			if entry[0] > self.clock():
+				self.hits += 1
+				return entry[1]
+			del self._cache[key]
+		future = self._pending.get(key)
+		if future is not None:
+			self.coalesced += 1
+		else:
+			self.misses += 1
+			loop = asyncio.get_running_loop()
+			future = loop.run_in_executor(self.executor, func, *args)
+			self._pending[key] = future
+			future.add_done_callback(functools.partial(self._done, key))
+		# a cancelled caller must not cancel the calculation of the others
+		return await asyncio.shield(future)
+
+	def _done(self, key, future):
+		del self._pending[key]
+		if future.cancelled() or future.exception() is not None:
+			return
+		self._cache[key] = (self.clock() + self.ttl, future.result())
+		while len(self._cache) > self.size:
+			self._cache.popitem(last=False)
+
+def _calculate_range(config, date, days):
+	return config.calculator().date(date).calculate_range(days)
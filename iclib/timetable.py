@@ -0,0 +1,74 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Timetables of many locations, calculated by several processes"""
+
+from . import salat
+import concurrent.futures
+
+
+def generate(locations, date, days, method=('mwl',), workers=None,
+		chunk_size=64, progress=None):
+	"""Calculate timetables of many locations
+
+	Locations are split into chunks calculated by a pool of processes. The
+	result of each location is the same as TimeCalculator.calculate_range
+	(hence calculate) in a single process, and it is in the order of
+	locations regardless of which chunk finishes first.
+
+	Param:
+	locations as iterable of 4-tuple - lat, lng, h, and tz like in
+		TimeCalculator.location
+	date as datetime.date - first date
+	days as int - number of days
+	method as tuple - args of TimeCalculator.method, e.g. ('egypt', 'hanafi')
+	workers as int - number of processes, default is number of CPUs, 0 means
+		calculate in this process
+	chunk_size as int - number of locations per unit of work
+	progress as function - called as progress(done, total) after each chunk,
+		with number of locations
+
+	Return:
+	generator of TimeTable - one per location
+	"""
+	locations = list(locations)
+	total = len(locations)
+	chunks = [locations[i:i + chunk_size] for i in range(0, total, chunk_size)]
+	if workers == 0:
+		results = (_calculate_chunk(chunk, date, days, method)
+			for chunk in chunks)
+		for table in _collect(results, total, progress):
+			yield table
+		return
+	with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+		futures = [executor.submit(_calculate_chunk, chunk, date, days, method)
+			for chunk in chunks]
+		try:
+			for table in _collect((f.result() for f in futures), total,
+					progress):
+				yield table
+		finally: # e.g. the generator is closed early
+			for f in futures:
+				f.cancel()
+
+def _collect(results, total, progress):
+	done = 0
+	for tables in results:
+		done += len(tables)
+		if progress: progress(done, total)
+		for table in tables:
+			yield table
+
+def _calculate_chunk(locations, date, days, method):
+	c = salat.TimeCalculator().method(*method).date(date)
+	return [c.location(*loc).calculate_range(days) for loc in locations]
@@ -0,0 +1,131 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Timezones whose offset depends on the date, such as daylight saving time
+
+The offset of a date is the offset at its midday, when the prayer times are
+calculated from. Querying a datetime.tzinfo (e.g. zoneinfo.ZoneInfo) for
+every date is slow, so the dates where the offset changes are found once per
+zone and looked up by bisection.
+"""
+
+from . import formula
+import array
+import bisect
+import datetime
+import threading
+
+
+class Zone(object):
+	"""Offsets of a datetime.tzinfo by date
+
+	Transitions are searched weekly then bisected to the day, so two of them
+	less than a week apart may be missed. Dates outside the years searched
+	query the tzinfo directly.
+	"""
+
+	def __init__(self, tzinfo, start=1900, end=2100, step=7):
+		"""Find the transitions of a tzinfo
+
+		Param:
+		tzinfo as datetime.tzinfo - the zone
+		start as int - first year searched
+		end as int - year after the last year searched
+		step as int - days between the dates queried while searching
+		"""
+		self.tzinfo = tzinfo
+		self.start = formula.gregorian_to_jd(start, 1, 1)
+		self.end = formula.gregorian_to_jd(end, 1, 1)
+		# Julian Day of the first date of each offset, except the first one
+		self._jd = array.array('d')
+		self._offsets = array.array('d', (self.query(self.start),))
+		jd, offset = self.start, self._offsets[0]
+		while jd < self.end:
+			next_jd = min(jd + step, self.end - 1)
+			next_offset = self.query(next_jd)
+			if next_offset != offset:
+				low, high = jd, next_jd
+				while high - low > 1:
+					mid = low + (high - low) // 2
+					if self.query(mid) == offset: low = mid
+					else: high = mid
+				self._jd.append(high)
+				self._offsets.append(next_offset)
+			if next_jd == jd: break
+			jd, offset = next_jd, next_offset
+
+	def query(self, jd):
+		"""Return offset in hours of a date from the tzinfo, without index
+
+		Param:
+		jd as number - Julian Day at midnight of the date
+		"""
+		y, m, d = formula.jd_to_gregorian(jd)
+		offset = self.tzinfo.utcoffset(datetime.datetime(y, m, d, 12))
+		return offset.total_seconds() / 3600.0
+
+	def offset(self, jd):
+		"""Return offset in hours of a date, x means UTC+x
+
+		Param:
+		jd as number - Julian Day at midnight of the date
+		"""
+		if self.start <= jd < self.end:
+			return self._offsets[bisect.bisect_right(self._jd, jd)]
+		return self.query(jd)
+
+	def segments(self, jd, days=None):
+		"""Split consecutive dates into runs having the same offset
+
+		Param:
+		jd as number - Julian Day at midnight of the first date
+		days as int - number of days, None means infinite
+
+		Return:
+		generator of 3-tuple - first day (0 is the first date), day after the
+			last one, and offset in hours
+		"""
+		i = 0
+		while days is None or i < days:
+			day_jd = jd + i
+			if self.start <= day_jd < self.end:
+				k = bisect.bisect_right(self._jd, day_jd)
+				next_jd = self._jd[k] if k < len(self._jd) else self.end
+				stop = int(round(next_jd - jd))
+				offset = self._offsets[k]
+			else:
+				stop = i + 1
+				offset = self.query(day_jd)
+			if days is not None: stop = min(stop, days)
+			yield i, stop, offset
+			i = stop
+
+	def __repr__(self):
+		return 'Zone({!r})'.format(self.tzinfo)
+
+
+_zones = {}
+_lock = threading.Lock()
+
+def get(tzinfo):
+	"""Return the Zone of a tzinfo, created once and shared"""
+	try:
+		return _zones[tzinfo]
+	except KeyError:
+		pass
+	with _lock:
+		try:
+			return _zones[tzinfo]
+		except KeyError:
+			zone = _zones[tzinfo] = Zone(tzinfo)
+			return zone
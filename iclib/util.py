@@ -12,6 +12,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
 import math
 
 
@@ -33,6 +34,29 @@ def dms_str(deg, prec):
 	else:
 		return '{}° {}′ {:.{}f}″'.format(d, m, s, prec)
 
+def dms_array(deg):
+	"""Like dms, but for NumPy arrays (NumPy is needed)
+
+	Return:
+	int array - degree
+	int array - minute
+	float array - second
+	"""
+	import numpy as np
+	seconds = np.asarray(deg, dtype=float) * 3600
+	return (np.trunc(seconds / 3600).astype(int),
+		np.trunc(np.fmod(seconds, 3600) / 60).astype(int),
+		np.fmod(seconds, 60))
+
+def dms_str_array(deg, prec):
+	"""Like dms_str, but for NumPy arrays (NumPy is needed)"""
+	import numpy as np
+	deg = np.asarray(deg, dtype=float)
+	d, m, s = dms_array(np.abs(deg))
+	parts = (np.where(deg < 0, '-', ''), d.astype(str), '° ', m.astype(str),
+		'′ ', np.char.mod('%.{}f'.format(prec), s), '″')
+	return functools.reduce(np.char.add, parts)
+
 def hms(hours):
 	"""Convert hours to hour-minute-second
 
@@ -0,0 +1,189 @@
+# Copyright (C) 2015 Fikrul Arif
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Same convention as formula, except that every number param can also be a
+# NumPy array (or anything numpy.asarray accepts), and the result is an array
+# broadcast from all of the params.
+"""Vectorized basic formula of calculation
+
+This module mirrors formula for NumPy arrays, so a whole year or thousands of
+locations can be calculated in one call. It needs NumPy, which is optional for
+the rest of the library. See formula for the meaning of the params.
+"""
+import numpy as np
+
+from .formula import (ASR_RATIO_MAJORITY, ASR_RATIO_HANAFI, KAABA_LAT,
+	KAABA_LNG)
+
+
+def zuhr   (lng, tz, et):
+	return 12 + np.asarray(tz) - np.asarray(lng) / 15.0 - np.asarray(et)
+
+def asr    (t_zuhr, lat, ds, asr_ratio):
+	alt = _acot_deg(asr_ratio + _tan_deg(np.abs(np.subtract(ds, lat))))
+	return t_zuhr + hour_angle(lat, alt, ds) / 15.0
+
+def maghrib(t_zuhr, lat, ds, h):
+	alt = -0.8333 - 0.0347 * np.sqrt(h)
+	return t_zuhr + hour_angle(lat, alt, ds) / 15.0
+
+def isha   (t_zuhr, lat, ds, isha_angle):
+	alt = -np.asarray(isha_angle)
+	return t_zuhr + hour_angle(lat, alt, ds) / 15.0
+
+def fajr   (t_zuhr, lat, ds, fajr_angle):
+	alt = -np.asarray(fajr_angle)
+	return t_zuhr - hour_angle(lat, alt, ds) / 15.0
+
+def sunrise(t_zuhr, lat, ds, h):
+	alt = -0.8333 - 0.0347 * np.sqrt(h) # equals to maghrib
+	return t_zuhr - hour_angle(lat, alt, ds) / 15.0
+
+def hour_angle(lat, alt, ds):
+	"""Return hour angle in degrees, -inf or inf like formula.hour_angle"""
+	cos_ha = ((_sin_deg(alt) - _sin_deg(lat) * _sin_deg(ds))
+		/     (                _cos_deg(lat) * _cos_deg(ds)))
+	ha = _acos_deg(np.clip(cos_ha, -1, 1))
+	ha = np.where(cos_ha < -1, -np.inf, ha)
+	return np.where(cos_ha > 1, np.inf, ha)
+
+def eq_time(jd):
+	"""Return Equation of Time in hours"""
+	u = (np.asarray(jd) - 2451545) / 36525.0
+	l0 = 280.46607 + 36000.7698 * u
+	return (
+		-(1789 + 237 * u) * _sin_deg(l0)
+		- (7146 - 62 * u) * _cos_deg(l0)
+		+ (9934 - 14 * u) * _sin_deg(2 * l0)
+		- (29 +    5 * u) * _cos_deg(2 * l0)
+		+ (74 +   10 * u) * _sin_deg(3 * l0)
+		+ (320 -   4 * u) * _cos_deg(3 * l0)
+		- 212             * _sin_deg(4 * l0)) / 60000.0
+
+def decl_sun(jd):
+	"""Return declination of the Sun in degrees"""
+	t = 2 * np.pi * (np.asarray(jd) - 2451545) / 365.25
+	return (0.37877
+		+ 23.264  * _sin_deg(    57.297 * t - 79.547)
+		+ 0.3812  * _sin_deg(2 * 57.297 * t - 82.682)
+		+ 0.17132 * _sin_deg(3 * 57.297 * t - 59.722))
+
+def gregorian_to_jd(y, m, d):
+	"""Return Julian Day of Gregorian or Julian dates, see formula
+
+	Param:
+	y as int array - year
+	m as int array - month [1..12]
+	d as int array - day [1..31]
+	"""
+	y, m, d = np.broadcast_arrays(
+		np.asarray(y, dtype=np.int64), np.asarray(m, dtype=np.int64), d)
+	if np.any(y < -4712): raise ValueError('year < -4712 is not supported')
+
+	early = m <= 2
+	m = np.where(early, m + 12, m)
+	y = np.where(early, y - 1, y)
+	if np.all(y > 1582):
+		# integer-only fast path, see formula
+		a = y // 100
+		return (1720996.5 - a + a // 4 + 1461 * y // 4 + 306 * (m + 1) // 10
+			+ d)
+	greg = (y > 1582) | ((y == 1582) & ((m > 10) | ((m == 10) & (d >= 15))))
+	a = np.floor(y / 100.0)
+	b = np.where(greg, 2 + np.floor(a / 4.0) - a, 0)
+	return (1720994.5 + np.floor(365.25 * y) + np.floor(30.6001 * (m + 1))
+		+ d + b)
+
+def jd_to_gregorian(jd):
+	"""Return Gregorian or Julian dates of Julian Days, see formula
+
+	Return:
+	int array - year
+	int array - month [1..12]
+	int array - day [1..31]
+	"""
+	jd = np.asarray(jd, dtype=float)
+	if np.any(jd < -0.5):
+		raise ValueError('Julian Day < -0.5 is not supported')
+
+	if np.all(jd >= 2299160.5):
+		# integer-only fast path, see formula
+		l = np.floor(jd + 0.5).astype(np.int64) + 68569
+		n = 4 * l // 146097
+		l -= (146097 * n + 3) // 4
+		i = 4000 * (l + 1) // 1461001
+		l += 31 - 1461 * i // 4
+		j = 80 * l // 2447
+		day = l - 2447 * j // 80
+		l = j // 11
+		return (100 * (n - 49) + i + l, j + 2 - 12 * l, day)
+
+	jd1 = jd + 0.5
+	z = np.floor(jd1)
+	f = jd1 - z
+	aa = np.floor((z - 1867216.25) / 36524.25)
+	a = np.where(z < 2299161, z, z + 1 + aa - np.floor(aa / 4.0))
+	b = a + 1524
+	c = np.floor((b - 122.1) / 365.25)
+	d = np.floor(365.25 * c)
+	e = np.floor((b - d) / 30.6001)
+	day = b - d - np.floor(30.6001 * e) + f
+	month = np.where(e < 14, e - 1, e - 13)
+	year = np.where(month <= 2, c - 4715, c - 4716)
+	return (year.astype(np.int64), month.astype(np.int64),
+		day.astype(np.int64))
+
+def jd_to_weekday(jd):
+	"""Return weekdays [1..7] of Julian Days where 1 is Ahad/Sunday"""
+	return (np.floor(np.asarray(jd) + 1.5) % 7).astype(np.int64) + 1
+
+def adjust_jd_hour(jd, hours):
+	"""Return Julian Days with added hours"""
+	return np.asarray(jd) + np.asarray(hours) / 24.0
+
+def qibla(lat, lng):
+	"""Return qibla directions in degrees from the north (clock-wise)"""
+	lng_a = KAABA_LNG
+	lat_a = KAABA_LAT
+	deg = _atan2_deg(_sin_deg(lng_a - np.asarray(lng)),
+		_cos_deg(lat) * _tan_deg(lat_a)
+		- _sin_deg(lat) * _cos_deg(lng_a - np.asarray(lng)))
+	return np.where(deg >= 0, deg, deg + 360)
+
+def kaaba_distance(lat, lng):
+	"""Return great-circle distances to the Kaaba in meters"""
+	lng_a = KAABA_LNG
+	lat_a = KAABA_LAT
+	a = (_sin_deg((np.asarray(lat) - lat_a) / 2.0) ** 2
+		+ _cos_deg(lat) * _cos_deg(lat_a)
+		* _sin_deg((np.asarray(lng) - lng_a) / 2.0) ** 2)
+	return 2 * 6371008.8 * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+def _sin_deg(deg):
+	return np.sin(np.radians(deg))
+
+def _cos_deg(deg):
+	return np.cos(np.radians(deg))
+
+def _acos_deg(x_r):
+	return np.degrees(np.arccos(x_r))
+
+def _tan_deg(deg):
+	return np.tan(np.radians(deg))
+
+def _acot_deg(x_y):
+	return np.degrees(np.arctan(1.0 / np.asarray(x_y)))
+
+def _atan2_deg(y, x):
+	return np.degrees(np.arctan2(y, x))